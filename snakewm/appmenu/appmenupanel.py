@@ -1,6 +1,14 @@
 """
 App menu panel containing a list of all apps or subdirectories in the
 current directory.
+
+The panels are built once and then shown and hidden: the WM keeps the
+root panel between openings, and each panel keeps the sub panels it has
+opened. Only a new apps tree or a language change rebuilds them.
+
+A panel only has buttons for the rows that fit on the screen. A
+directory with more entries scrolls with the mouse wheel: the buttons
+stay, and take the names of the entries scrolled into view.
 """
 import i18n
 import os
@@ -14,6 +22,10 @@ from pygame_gui.elements import UIButton
 # button dimensions
 BUTTON_DIMS = (125, 25) # 104,25
 
+# Load dictionary with language translations, once.
+i18n.load_path.append('snakewm/appmenu/data/translations/')
+i18n.set('filename_format','{locale}.{format}')
+
 class AppMenuPanel(UIPanel):
     manager = None
     pos = None
@@ -24,20 +36,32 @@ class AppMenuPanel(UIPanel):
     # that means its corresponding key represents an app.
     elements = None
 
-    # sub panel created when a directory button is hovered
+    # sub panel shown while a directory button is hovered
     sub = None
 
-    def __init__(self, manager, pos, path, elements, loadfunc):
+    # sub panels built so far, by directory name
+    subs = None
+
+    # index of the entry shown on the top row
+    offset = 0
+
+    def __init__(self, manager, pos, path, elements, loadfunc, hoverfunc=None):
         """
         manager - UIManager to manage this panel
         pos - position indices to start drawing this panel at
         path - the directory this panel represents
         elements - list of elements in this directory
+        loadfunc - called with the app path when an app is clicked
+        hoverfunc - called with the app path when an app is hovered
         """
+        # Only as many rows as fit on the screen get a button.
+        self.row_count = min(len(elements), max(1, manager.window_resolution[1] // BUTTON_DIMS[1]))
+        self.max_row = manager.window_resolution[1] // BUTTON_DIMS[1] - self.row_count
+
         super().__init__(
             relative_rect = pygame.Rect(
-                (pos[0] * BUTTON_DIMS[0], pos[1] * BUTTON_DIMS[1]),
-                (BUTTON_DIMS[0] + 0, BUTTON_DIMS[1] * len(elements.keys()) + 0),
+                (pos[0] * BUTTON_DIMS[0], min(pos[1], self.max_row) * BUTTON_DIMS[1]),
+                (BUTTON_DIMS[0] + 0, BUTTON_DIMS[1] * self.row_count + 0),
             ),
             starting_height=100,  # floats at this level in the element stack
             object_id=ObjectID(class_id="@appmenupanel_panel",
@@ -49,26 +73,51 @@ class AppMenuPanel(UIPanel):
         self.path = path
         self.elements = elements
         self.loadfunc = loadfunc
+        self.hoverfunc = hoverfunc
+        self.locale = manager.get_locale()
+        self.subs = {}
 
         # sorted list of element keys to generate the panel from
         self.element_keys = sorted(list(elements.keys()))
 
-        # Load dictionary with language translations.
-        i18n.load_path.append('snakewm/appmenu/data/translations/')
-        i18n.set('filename_format','{locale}.{format}')
-
-        # Generate buttons.
-        for i in range(len(self.element_keys)):
-            UIButton(
+        # Generate buttons for the visible rows.
+        self.rows = []
+        for i in range(self.row_count):
+            self.rows.append(UIButton(
                 pygame.Rect((0, i * BUTTON_DIMS[1]), BUTTON_DIMS),
                 text=self.element_keys[i],
                 manager=manager,
                 container=self,
                 object_id=ObjectID(class_id="@appmenupanel_button",
                                    object_id="#menu-" + self.path.replace(".", "-"))
-            )
+            ))
+
+    def entry(self, button):
+        """ The entry name shown on one of this panel's buttons. """
+        return self.element_keys[self.offset + self.rows.index(button)]
+
+    def scroll(self, rows):
+        """ Scroll the entries by 'rows', reusing the row buttons. """
+        offset = max(0, min(self.offset + rows, len(self.element_keys) - self.row_count))
+        if offset == self.offset:
+            return
+        self.offset = offset
+        if self.sub is not None:
+            self.sub.close()
+            self.sub = None
+        for i, button in enumerate(self.rows):
+            button.set_text(self.element_keys[offset + i])
 
     def process_event(self, event):
+        if (
+            event.type == pygame.MOUSEWHEEL
+            and self.visible
+            and len(self.element_keys) > self.row_count
+            and self.rect.collidepoint(self.ui_manager.get_mouse_position())
+        ):
+            self.scroll(-event.y)
+            return True
+
         if event.type != pygame.USEREVENT:
             return
 
@@ -76,7 +125,7 @@ class AppMenuPanel(UIPanel):
             "#appmenupanel.#menu-" + self.path.replace(".", "-")
         ):
             # open clicked app
-            uitext = event.ui_element.text
+            uitext = self.entry(event.ui_element)
 
             if self.elements[uitext] == None:
                 self.loadfunc(self.path + "." + uitext)
@@ -92,29 +141,69 @@ class AppMenuPanel(UIPanel):
             event.user_type == pygame_gui.UI_BUTTON_ON_HOVERED
             and event.ui_object_id == ("#appmenupanel.#menu-" + self.path.replace(".", "-"))
         ):
-            uitext = event.ui_element.text
+            uitext = self.entry(event.ui_element)
+
+            if self.elements[uitext] == None and self.hoverfunc is not None:
+                # start loading the app, it is likely to be clicked next
+                self.hoverfunc(self.path + "." + uitext)
 
             if self.elements[uitext] != None:
-                # first destroy the active sub panel
+                # first close the active sub panel
                 if self.sub is not None:
-                    self.sub.destroy()
+                    self.sub.close()
+
+                # next open the sub panel next to the hovered row, built on first use
+                pos = (self.pos[0] + 1,
+                       self.rect.top // BUTTON_DIMS[1] + self.rows.index(event.ui_element))
+                self.sub = self.subs.get(uitext)
+                if self.sub is None:
+                    self.sub = AppMenuPanel(
+                        self.ui_manager,
+                        pos,
+                        self.path + "." + uitext,
+                        self.elements[uitext],
+                        self.loadfunc,
+                        self.hoverfunc,
+                    )
+                    self.subs[uitext] = self.sub
+                else:
+                    self.sub.open(pos)
+
+    def is_current(self, elements, locale):
+        """
+        True if this panel was built from the 'elements' tree in 'locale',
+        and can be shown again instead of rebuilt.
+        """
+        return self.alive() and self.elements is elements and self.locale == locale
+
+    def open(self, pos=None):
+        """
+        Show this panel, at 'pos' if given. Its sub panels were hidden
+        when it closed.
+        """
+        if pos is not None and pos != self.pos:
+            self.pos = pos
+            self.set_relative_position((pos[0] * BUTTON_DIMS[0],
+                                        min(pos[1], self.max_row) * BUTTON_DIMS[1]))
+        self.show()
 
-                # next open a new sub panel
-                self.sub = AppMenuPanel(
-                    self.ui_manager,
-                    (self.pos[0] + 1, self.pos[1] + self.element_keys.index(uitext)),
-                    self.path + "." + uitext,
-                    self.elements[uitext],
-                    self.loadfunc,
-                )
+    def close(self):
+        """
+        Hide this panel and all sub panels, keeping them for next time.
+        """
+        if self.sub is not None:
+            self.sub.close()
+            self.sub = None
+        self.hide()
 
     def destroy(self):
         """
         Recursively kill this panel and all sub panels.
         """
-        if self.sub is not None:
-            self.sub.destroy()
-            self.sub = None
+        for sub in self.subs.values():
+            sub.destroy()
+        self.subs = {}
+        self.sub = None
         self.kill()
 
 """
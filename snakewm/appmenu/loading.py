@@ -0,0 +1,44 @@
+"""
+Placeholder window shown while an app is loading in the background.
+"""
+import pygame
+import pygame_gui
+
+from pygame_gui.elements import UILabel
+
+
+class LoadingWindow(pygame_gui.elements.UIWindow):
+    """ A small window standing in for an app until it is ready. """
+    DIMS = (160, 60)
+    FRAME_RATE = 4  # animates the dots
+
+    def __init__(self, pos, manager, app):
+        """
+        pos - where the app's window will open
+        app - module name of the app, e.g. "apps.image.dance"
+        """
+        self.app_name = app.split(".")[-1]
+        super().__init__(
+            pygame.Rect(pos, (self.DIMS[0] + 32, self.DIMS[1] + 60)),
+            manager=manager,
+            window_display_title=self.app_name,
+            object_id="#loading",
+            resizable=False,
+        )
+        self.label = UILabel(
+            pygame.Rect((0, 0), self.DIMS),
+            "loading",
+            manager=manager,
+            container=self,
+            parent_element=self,
+        )
+        self.elapsed = 0.0
+        self.dots = 0
+
+    def update(self, delta):
+        super().update(delta)
+        self.elapsed += delta
+        dots = int(self.elapsed * 2) % 4
+        if dots != self.dots:
+            self.dots = dots
+            self.label.set_text("loading" + "." * dots)
@@ -0,0 +1,201 @@
+"""
+App manifest: a cached description of the apps tree.
+
+Walking snakewm/apps with a stat per entry is slow on an SD card, so the
+result is kept in a JSON manifest with one record per app (name, category,
+module, translated labels, icon) and the mtime of every directory that was
+walked. At startup the manifest is loaded with a single read. A background
+thread then re-checks the directory mtimes and rebuilds the manifest only
+if an app or category was added, removed or renamed.
+"""
+
+import json
+import os
+import threading
+
+# Bump when the manifest layout changes, to force a rescan.
+MANIFEST_VERSION = 1
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "glowfire",
+)
+CACHE_PATH = os.path.join(CACHE_DIR, "appmanifest.json")
+
+TRANSLATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/translations")
+
+# Optional per-app icon, looked up in each app's directory.
+ICON_NAMES = ("icon.png", "data/icon.png")
+
+
+class AppManifest:
+    """ Cached list of apps and categories under the apps directory. """
+
+    def __init__(self, apps_path, cache_path=CACHE_PATH, translations_path=TRANSLATIONS_PATH):
+        self.apps_path = apps_path
+        self.cache_path = cache_path
+        self.translations_path = translations_path
+
+        # One dict per app: name, category, module, labels, icon.
+        self.apps = []
+        # Category path ("games", "sound") -> translated labels.
+        self.categories = {}
+        # Relative directory or translation file -> mtime in ns, at scan time.
+        self.mtimes = {}
+
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """ Load the manifest from the cache, or scan the tree if there is none. """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION or data.get("root") != self.apps_path:
+                raise ValueError("stale manifest")
+            self.apps = data["apps"]
+            self.categories = data["categories"]
+            self.mtimes = data["mtimes"]
+        except (OSError, ValueError, KeyError):
+            print("DEBUG: App manifest missing or stale. Scanning apps tree.")
+            self.scan()
+            self.save()
+
+    def save(self):
+        """ Write the manifest to the cache. """
+        data = {
+            "version": MANIFEST_VERSION,
+            "root": self.apps_path,
+            "apps": self.apps,
+            "categories": self.categories,
+            "mtimes": self.mtimes,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print("ERROR: Could not save app manifest: " + str(e))
+
+    def load_translations(self):
+        """ Return {locale: {key: label}} from the app menu translation files. """
+        translations = {}
+        try:
+            entries = list(os.scandir(self.translations_path))
+        except OSError:
+            return translations
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            self.mtimes[os.path.join("@translations", entry.name)] = entry.stat().st_mtime_ns
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    translations.update(json.load(f))
+            except (OSError, ValueError):
+                print("ERROR: Could not read translation file " + entry.path)
+        return translations
+
+    def scan(self):
+        """
+        Walk the apps tree. A directory containing __init__.py is an app;
+        any other directory is a category that may contain more apps.
+        """
+        self.mtimes = {}
+        translations = self.load_translations()
+        apps = []
+        categories = {}
+
+        def labels(key):
+            return {
+                locale: table[key]
+                for locale, table in translations.items()
+                if isinstance(table, dict) and key in table
+            }
+
+        def walk(path, category):
+            rel = os.path.relpath(path, self.apps_path)
+            self.mtimes[rel] = os.stat(path).st_mtime_ns
+            for entry in os.scandir(path):
+                if not entry.is_dir():
+                    continue
+                parts = category + [entry.name]
+                if os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                    self.mtimes[os.path.join(rel, entry.name)] = entry.stat().st_mtime_ns
+                    icon = None
+                    for name in ICON_NAMES:
+                        if os.path.isfile(os.path.join(entry.path, name)):
+                            icon = os.path.join(entry.path, name)
+                            break
+                    apps.append(
+                        {
+                            "name": entry.name,
+                            "category": ".".join(category),
+                            "module": ".".join(["apps"] + parts),
+                            "labels": labels(entry.name),
+                            "icon": icon,
+                        }
+                    )
+                else:
+                    categories[".".join(parts)] = labels(entry.name)
+                    walk(entry.path, parts)
+
+        walk(self.apps_path, [])
+        with self.lock:
+            self.apps = sorted(apps, key=lambda app: app["module"])
+            self.categories = categories
+
+    def is_stale(self):
+        """ True if any directory or translation file changed since the scan. """
+        for rel, mtime in self.mtimes.items():
+            if rel.startswith("@translations"):
+                path = os.path.join(self.translations_path, os.path.basename(rel))
+            else:
+                path = os.path.normpath(os.path.join(self.apps_path, rel))
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def refresh_async(self, on_change=None):
+        """
+        Re-check the tree on a background thread. If it changed, rescan,
+        save, and call on_change(manifest) from that thread.
+        """
+
+        def refresh():
+            if not self.is_stale():
+                return
+            print("DEBUG: Apps tree changed. Refreshing app manifest.")
+            self.scan()
+            self.save()
+            if on_change is not None:
+                on_change(self)
+
+        thread = threading.Thread(target=refresh, name="appmanifest", daemon=True)
+        thread.start()
+        return thread
+
+    def tree(self):
+        """
+        Return the apps as nested dicts, the structure AppMenuPanel takes:
+        categories map to dicts, apps map to None.
+        """
+        with self.lock:
+            apps = list(self.apps)
+            categories = list(self.categories)
+        tree = {}
+        for category in categories:
+            node = tree
+            for part in category.split("."):
+                node = node.setdefault(part, {})
+        for app in apps:
+            node = tree
+            if app["category"]:
+                for part in app["category"].split("."):
+                    node = node.setdefault(part, {})
+            node[app["name"]] = None
+        return tree
@@ -0,0 +1,178 @@
+"""
+Search index over the app manifest, for the type-to-search launcher.
+
+Every app is indexed under its name, its category names, and their
+translated labels. Words are broken into trigrams, padded at the front so
+the first letters of a word make trigrams of their own; an app matches
+when it has at least half of the query's trigrams, so a wrong or missing
+letter in a longer word still finds it. Short words lose too many
+trigrams to a typo ("dnace" shares none with "dance"), so when there are
+few trigram matches, the apps with a word starting with the query's first
+letter are also checked for words a letter or two of editing away, a
+swap of two neighbouring letters counting as one edit. Queries of one or
+two letters use a prefix table instead. A lookup only touches the apps
+sharing a trigram or a first letter with the query, so it stays well
+inside a frame however many apps there are.
+"""
+
+import collections
+
+# Results returned by AppIndex.search().
+MAX_RESULTS = 8
+
+# Fraction of the query's trigrams an app must share to be a match.
+MIN_OVERLAP = 0.5
+
+# Query words this long may be two edits from a word, not just one.
+TWO_EDIT_LENGTH = 6
+
+
+def words(text):
+    """ Lowercase words of a name or label; '_' and '-' split words. """
+    for sep in "_-.":
+        text = text.replace(sep, " ")
+    return text.lower().split()
+
+
+def trigrams(word):
+    """ Trigrams of a word, with two leading spaces marking its start. """
+    padded = "  " + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Edits (insert, delete, change a letter, swap two neighbouring letters)
+    turning a into b, or limit + 1 once there are more than 'limit'.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, row = row, current
+    return row[-1]
+
+
+def near(query_word, word):
+    """ True if 'word' is within a typo or two of 'query_word'. """
+    limit = 1 if len(query_word) < TWO_EDIT_LENGTH else 2
+    return edit_distance(query_word, word, limit) <= limit
+
+
+class AppIndex:
+    """ Trigram and prefix index of the apps in a manifest. """
+
+    def __init__(self, apps, categories):
+        """
+        apps - the manifest's app records (name, category, module, labels)
+        categories - the manifest's category path -> labels
+        """
+        self.apps = list(apps)
+        # Per app: the strings it is found by, name first.
+        self.terms = []
+        # Trigram -> indices of apps having it; prefix -> the same.
+        self.grams = collections.defaultdict(set)
+        self.prefixes = collections.defaultdict(set)
+
+        for i, app in enumerate(self.apps):
+            terms = [app["name"]] + list(app.get("labels", {}).values())
+            if app["category"]:
+                path = []
+                for part in app["category"].split("."):
+                    path.append(part)
+                    terms.append(part)
+                    terms.extend(categories.get(".".join(path), {}).values())
+            terms = [term.lower() for term in terms]
+            self.terms.append(terms)
+            for term in terms:
+                for word in words(term):
+                    for gram in trigrams(word):
+                        self.grams[gram].add(i)
+                    self.prefixes[word[:1]].add(i)
+                    self.prefixes[word[:2]].add(i)
+
+    @classmethod
+    def from_manifest(cls, manifest):
+        with manifest.lock:
+            return cls(manifest.apps, dict(manifest.categories))
+
+    def rank(self, i, query):
+        """ Sort key for app i: better matches sort first. """
+        terms = self.terms[i]
+        name = terms[0]
+        if name == query:
+            kind = 0
+        elif name.startswith(query):
+            kind = 1
+        elif any(word.startswith(query) for term in terms for word in words(term)):
+            kind = 2
+        elif any(query in term for term in terms):
+            kind = 3
+        else:
+            kind = 4
+        return (kind, len(name), name)
+
+    def search(self, query, limit=MAX_RESULTS):
+        """ The app records best matching 'query', best first. """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        if len(query) < 3:
+            candidates = self.prefixes.get(query, set())
+            ranked = sorted(candidates, key=lambda i: self.rank(i, query))
+        else:
+            query_words = words(query)
+            if not query_words:
+                return []
+            grams = set()
+            for word in query_words:
+                grams |= trigrams(word)
+            # Matching needs the query's own trigrams, found anywhere in a
+            # word; the padded ones only rank word starts higher.
+            inner = {gram for gram in grams if not gram.startswith(" ")}
+            matched = collections.Counter()
+            for gram in inner:
+                matched.update(self.grams.get(gram, ()))
+            counts = collections.Counter(matched)
+            for gram in grams - inner:
+                counts.update(self.grams.get(gram, ()))
+            needed = MIN_OVERLAP * len(inner)
+            candidates = [i for i, count in matched.items() if count >= needed]
+
+            def key(i):
+                # Closer matches first, then by the number of shared trigrams.
+                kind, length, name = self.rank(i, query)
+                return (kind, -counts[i], length, name)
+
+            ranked = sorted(candidates, key=key)
+            if len(ranked) < limit:
+                ranked += self.near_matches(query, set(ranked))
+        return [self.apps[i] for i in ranked[:limit]]
+
+    def near_matches(self, query, exclude):
+        """
+        Apps outside 'exclude' having, for every word of 'query', a word
+        within a typo or two of it. Only apps with a word starting with
+        the query's first letter are checked.
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        found = []
+        for i in self.prefixes.get(query_words[0][:1], ()):
+            if i in exclude:
+                continue
+            app_words = [word for term in self.terms[i] for word in words(term)]
+            if all(any(near(q, word) for word in app_words) for q in query_words):
+                found.append(i)
+        return sorted(found, key=lambda i: self.rank(i, query))
@@ -0,0 +1,147 @@
+"""
+Type-to-search launcher. While the app menu is open, typed letters go
+here instead of to the focused window; the best matching apps are shown
+next to the menu, and Enter or a click opens one.
+"""
+import pygame
+import pygame_gui
+from pygame_gui.core import ObjectID
+
+from pygame_gui.elements import UIPanel
+from pygame_gui.elements import UIButton
+from pygame_gui.elements import UILabel
+
+from .appmenupanel import BUTTON_DIMS
+from .search import MAX_RESULTS
+
+
+class SearchPanel(UIPanel):
+    """ Query line and ranked results, one button per result. """
+
+    def __init__(self, manager, index, loadfunc, hoverfunc=None, shortcutfunc=None, pos=(1, 0)):
+        """
+        manager - UIManager to manage this panel
+        index - AppIndex built from the app manifest
+        loadfunc - called with the app path when a result is opened
+        hoverfunc - called with the app path when a result is hovered
+        shortcutfunc - called with a KEYDOWN event; True if the key is a
+                       shortcut of the WM's, which typing must not take
+        pos - position indices to draw this panel at
+        """
+        self.row_count = min(MAX_RESULTS, manager.window_resolution[1] // BUTTON_DIMS[1] - 1)
+        super().__init__(
+            relative_rect = pygame.Rect(
+                (pos[0] * BUTTON_DIMS[0], pos[1] * BUTTON_DIMS[1]),
+                (BUTTON_DIMS[0], BUTTON_DIMS[1] * (self.row_count + 1)),
+            ),
+            starting_height=100,  # floats at this level in the element stack
+            object_id=ObjectID(class_id="@appmenupanel_panel",
+                               object_id="#appsearch"
+            )
+        )
+        self.index = index
+        self.loadfunc = loadfunc
+        self.hoverfunc = hoverfunc
+        self.shortcutfunc = shortcutfunc
+        self.query = ""
+        # The TEXTINPUT that follows a shortcut's KEYDOWN is not typing either.
+        self.skip_text = False
+        self.results = []
+
+        self.query_label = UILabel(
+            pygame.Rect((0, 0), BUTTON_DIMS),
+            text="",
+            manager=manager,
+            container=self,
+            object_id=ObjectID(class_id="@appmenupanel_label",
+                               object_id="#appsearch_query")
+        )
+        self.rows = []
+        for i in range(self.row_count):
+            self.rows.append(UIButton(
+                pygame.Rect((0, (i + 1) * BUTTON_DIMS[1]), BUTTON_DIMS),
+                text="",
+                manager=manager,
+                container=self,
+                object_id=ObjectID(class_id="@appmenupanel_button",
+                                   object_id="#appsearch_result")
+            ))
+        self.hide()
+
+    def set_query(self, query):
+        """ Search for 'query' and show the results. An empty query hides the panel. """
+        self.query = query
+        if not query:
+            self.results = []
+            self.hide()
+            return
+
+        self.results = self.index.search(query, self.row_count)
+        locale = self.ui_manager.get_locale()
+        self.query_label.set_text(query + "_")
+        self.set_dimensions((BUTTON_DIMS[0], BUTTON_DIMS[1] * (len(self.results) + 1)))
+        self.show()
+        for i, button in enumerate(self.rows):
+            if i < len(self.results):
+                app = self.results[i]
+                button.set_text(app["labels"].get(locale, app["name"]))
+                button.show()
+            else:
+                button.hide()
+
+    def handle_key(self, event):
+        """
+        Take keyboard input meant for the search.
+        Returns True if the event was used and should go no further.
+        """
+        if event.type == pygame.TEXTINPUT:
+            if self.skip_text:
+                self.skip_text = False
+                return False
+            if not event.text.isprintable() or event.text.isspace():
+                return False
+            self.set_query(self.query + event.text)
+            return True
+
+        if event.type != pygame.KEYDOWN:
+            return False
+        self.skip_text = False
+        if event.mod & (pygame.KMOD_CTRL | pygame.KMOD_ALT):
+            return False
+        if self.shortcutfunc is not None and self.shortcutfunc(event):
+            self.skip_text = True
+            return False
+        if event.key == pygame.K_BACKSPACE and self.query:
+            self.set_query(self.query[:-1])
+            return True
+        if event.key == pygame.K_ESCAPE and self.query:
+            self.set_query("")
+            return True
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER) and self.results:
+            self.launch(self.results[0])
+            return True
+        # The key's text arrives next, as TEXTINPUT.
+        return bool(event.unicode) and event.unicode.isprintable() and not event.unicode.isspace()
+
+    def launch(self, app):
+        self.set_query("")
+        self.loadfunc(app["module"])
+        appmenuclose_event = pygame.event.Event(pygame.USEREVENT,
+                                ui_element="appmenupanel",
+                                ui_object_id="#appmenupanel",
+                                user_type="APPMENU_PANEL_CLOSED",
+                                message="AppMenuPanel_closed.")
+        pygame.event.post(appmenuclose_event)
+
+    def process_event(self, event):
+        if event.type != pygame.USEREVENT or getattr(event, "ui_element", None) not in self.rows:
+            return
+        row = self.rows.index(event.ui_element)
+        if row >= len(self.results):
+            return
+
+        if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
+            self.launch(self.results[row])
+        elif event.user_type == pygame_gui.UI_BUTTON_ON_HOVERED and self.hoverfunc is not None:
+            # start loading the app, it is likely to be clicked next
+            self.hoverfunc(self.results[row]["module"])
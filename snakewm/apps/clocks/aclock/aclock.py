@@ -13,6 +13,7 @@ TITLEBAR_HEIGHT = 40
 
 class SnakeAClock(pygame_gui.elements.UIWindow):
     DIMS = (190, 190)
+    FRAME_RATE = 4  # keeps the second hand ticking
 
     def __init__(self, pos, manager):
         super().__init__(
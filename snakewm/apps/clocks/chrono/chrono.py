@@ -7,6 +7,7 @@ from pygame_gui.core import ObjectID
 
 class Chrono(pygame_gui.elements.UIWindow):
     btn_height = 25  # button height
+    FRAME_RATE = 0  # 30 while counting, see process_event
     def __init__(self, pos, manager):
         super().__init__(
             pygame.Rect(pos, (175, 226)),
@@ -82,6 +83,7 @@ class Chrono(pygame_gui.elements.UIWindow):
             if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
                 if event.ui_element == self.start_button:
                     self.currently_counting = not self.currently_counting
+                    self.FRAME_RATE = 30 if self.currently_counting else 0
                 elif event.ui_element == self.reset_button:
                     self.reset_time()
                 elif event.ui_element == self.save_time:
@@ -111,6 +113,7 @@ class Chrono(pygame_gui.elements.UIWindow):
     def reset_time(self):
         self.time_counter = 0
         self.currently_counting = False
+        self.FRAME_RATE = 0
         self.update(0)
         self.laps_box.html_text = ""
         self.laps_box.rebuild()
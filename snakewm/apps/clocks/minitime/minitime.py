@@ -5,6 +5,8 @@ import datetime
 
 
 class MiniTime(pygame_gui.elements.UIWindow):
+    FRAME_RATE = 4  # keeps the seconds ticking
+
     def __init__(self, position, manager):
         super().__init__(
             rect=pygame.Rect(position, (133, 80)),
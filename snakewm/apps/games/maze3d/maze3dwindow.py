@@ -9,6 +9,10 @@ from .maze3d import Maze3D
 
 
 class Maze3DWindow(UIWindow):
+    FRAME_RATE = 60
+    BACKGROUND_FRAME_RATE = 0  # paused while unfocused
+    OCCLUDED = False
+
     def __init__(self, position, ui_manager):
         super().__init__(
             pygame.Rect(position, (390, 220)),
@@ -34,5 +38,7 @@ class Maze3DWindow(UIWindow):
 
     def update(self, time_delta):
         super().update(time_delta)
+        if self.OCCLUDED:
+            return
         self.maze3d.updatePos()
         self.maze3d.draw(self.game_surface_element.image)
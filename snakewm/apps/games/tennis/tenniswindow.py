@@ -9,6 +9,8 @@ from .tennis import TennisGame
 
 
 class TennisWindow(UIWindow):
+    FRAME_RATE = 60
+
     def __init__(self, position, ui_manager):
         super().__init__(
             pygame.Rect(position, (320, 220)),
@@ -23,6 +23,8 @@ NEWBASE = 75000  # score for a bonus base
 
 class Zap(pygame_gui.elements.UIWindow):
     res = SRES, int(0.75 * SRES)
+    FRAME_RATE = 60
+    BACKGROUND_FRAME_RATE = 0  # paused while unfocused
 
     def __init__(self, pos, manager):
         super().__init__(
@@ -1,12 +1,13 @@
-from .cyber import Cyber
-
-
 def load(manager, params):
     """
     Create cyber window and add it to the UI manager.
     params[0] should be the desired position. A default
     position will be used if a pos is not provided.
     """
+    # Imported here, not at the top: the WM theme loads images from this
+    # package at startup, which would otherwise load the whole app.
+    from .cyber import Cyber
+
     # default position
     pos = (0, 0)
 
@@ -14,3 +15,10 @@ def load(manager, params):
         pos = params[0]
 
     Cyber(pos, manager)
+
+
+def preload():
+    """
+    Import the app ahead of load(), off the UI thread.
+    """
+    from . import cyber  # noqa: F401
@@ -35,6 +35,9 @@ CYBER_SHIP_X = 100
 
 class Cyber(UIPanel):
     """ cyberspace wallpaper """
+    FRAME_RATE = 60
+    OCCLUDED = False
+
     def __init__(self, position, manager):
         super().__init__(
             Rect(position, (400,240)),
@@ -67,7 +70,8 @@ class Cyber(UIPanel):
 
     def update(self, time_delta):
         super().update(time_delta)
-        self.drawbg(self.dsurf.image)
+        if not self.OCCLUDED:
+            self.drawbg(self.dsurf.image)
 
     def drawbg(self, surface):
         """ Draw background image. """
@@ -1,4 +1,4 @@
-from .dance import Dance
+from .dance import Dance, load_frames
 
 
 def load(manager, params):
@@ -12,3 +12,10 @@ def load(manager, params):
         pos = params[0]
 
     Dance(pos, manager)
+
+
+def preload():
+    """
+    Decode the animation frames ahead of load(), off the UI thread.
+    """
+    load_frames(Dance.DIMS)
@@ -5,11 +5,27 @@ import pygame_gui
 
 from pygame_gui.elements.ui_image import UIImage
 
+from runtime import assets
+
+FRAMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frames")
+FRAME_COUNT = 180
+
+
+def load_frames(size):
+    """ Return the animation frames, scaled to 'size'. Safe on any thread. """
+    return [
+        assets.load_image(os.path.join(FRAMES_PATH, "frame-" + str(x) + ".png"), size)
+        for x in range(FRAME_COUNT)
+    ]
+
 
 class Dance(pygame_gui.elements.UIWindow):
     DIMS = (320, 240)
+    FRAME_RATE = 60  # advances one frame per update
+    BACKGROUND_FRAME_RATE = 15
+    OCCLUDED = False  # paused while covered
 
-    FRAMES = []
+    FRAMES = None
     FRAMES_LEN = 0
     FRAME_INDEX = 0
 
@@ -29,14 +45,8 @@ class Dance(pygame_gui.elements.UIWindow):
             parent_element=self,
         )
 
-        app_path = os.path.dirname(os.path.abspath(__file__))
-        frames_path = app_path + "/frames/"
-
-        for x in range(180):
-            # load each image into the frame list
-            frame = pygame.image.load(frames_path + "frame-" + str(x) + ".png")
-            frame = pygame.transform.scale(frame, self.DIMS)
-
+        self.FRAMES = []
+        for frame in load_frames(self.DIMS):
             # add each frame twice for half speed
             self.FRAMES.append(frame)
             self.FRAMES.append(frame)
@@ -51,6 +61,8 @@ class Dance(pygame_gui.elements.UIWindow):
 
     def update(self, delta):
         super().update(delta)
+        if self.OCCLUDED:
+            return
         self.dsurf.image.blit(self.FRAMES[self.FRAME_INDEX], (0, 0))
         self.FRAME_INDEX = (self.FRAME_INDEX + 1) % self.FRAMES_LEN
 
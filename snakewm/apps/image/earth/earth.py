@@ -189,6 +189,8 @@ def calc_image(res=DIMS):
 
 
 class Earth(pygame_gui.elements.UIWindow):
+    OCCLUDED = False  # no point rendering the globe while it is covered
+
     def __init__(self, pos, manager):
         super().__init__(
             pygame.Rect(pos, (DIMS[0] + 32, DIMS[1] + 60)),
@@ -218,6 +220,8 @@ class Earth(pygame_gui.elements.UIWindow):
             return
         else:
             super().set_display_title("earth")
+        if self.OCCLUDED:
+            return
         if time.time() - self.last > UPDATE:
             self.last = time.time()
             self.out = calc_image()
@@ -14,6 +14,9 @@ FPS = 15
 
 class Kaleido(pygame_gui.elements.UIWindow):
     DIMS = SRES, int(0.75 * SRES)
+    FRAME_RATE = FPS
+    BACKGROUND_FRAME_RATE = 5
+    OCCLUDED = False  # set by the WM while the window cannot be seen
 
     def __init__(self, pos, manager):
         super().__init__(
@@ -61,6 +64,8 @@ class Kaleido(pygame_gui.elements.UIWindow):
 
     def update(self, delta):
         super().update(delta)
+        if self.OCCLUDED:
+            return
         if (self.paused and not self.step) or (time.time() - self.lastframe < 1 / FPS):
             return
         self.step = False
@@ -1,4 +1,4 @@
-from .midi import MIDI
+from .midi import MIDI, load_samples
 
 
 def load(manager, params):
@@ -12,3 +12,10 @@ def load(manager, params):
         pos = params[0]
 
     MIDI(pos, manager)
+
+
+def preload():
+    """
+    Decode the instrument samples ahead of load(), off the UI thread.
+    """
+    load_samples()
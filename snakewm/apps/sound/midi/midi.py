@@ -37,6 +37,8 @@ from pygame_gui.elements.ui_image import UIImage
 
 import struct, time, statistics, glob, os
 
+from runtime import assets
+
 
 class Note(object):
     "Represents a single MIDI note"
@@ -188,16 +190,23 @@ FOREGROUND = (0,0,0)
 TARGET_FPS = 60  # FPS that pygame is expcted to run at
 PATH = os.path.dirname(os.path.abspath(__file__))
 SONG_DIR = PATH + "/goldberg"
+VOLUME = 0.2  # set on the channel at play time; the samples are shared
+
+def load_samples():
+    "Load samples. Safe on any thread"
+    samples = {}
+    for n in range(2, 89):
+        # samples are numbered with middle C == 39 (i.e. off by one)
+        samples[n] = assets.load_sound(PATH + "/midisnd/midi%02u.ogg" % (n - 1))
+    return samples
+
 
 def ini(s, res):
     "Load samples"
-    global audio
+    global audio, playing
 
-    audio = {}
-    for n in range(2, 89):
-        # samples are numbered with middle C == 39 (i.e. off by one)
-        audio[n] = pygame.mixer.Sound(PATH + "/midisnd/midi%02u.ogg" % (n - 1))
-        audio[n].set_volume(0.2)
+    audio = load_samples()
+    playing = {}  # pitch -> channel it last played on
 
 
 def load_song(s, res, fn):
@@ -228,8 +237,13 @@ def play(s, res, fpsfac, tfac):
     rinc = int(inc * fpsfac * tfac)
     for x, y in notes:
         if t <= y - first < t + rinc:
-            audio[x].stop()
-            audio[x].play()
+            channel = playing.get(x)
+            if channel is not None and channel.get_sound() is audio[x]:
+                channel.stop()
+            channel = audio[x].play()
+            if channel is not None:
+                channel.set_volume(VOLUME)
+                playing[x] = channel
             pygame.draw.rect(s, FOREGROUND, [RES[0] - 2, RES[1] - 5 * x, 2, 2])
             # print(y, x)
     t += rinc
@@ -241,6 +255,8 @@ def play(s, res, fpsfac, tfac):
 
 
 class MIDI(pygame_gui.elements.UIWindow):
+    FRAME_RATE = TARGET_FPS
+
     def __init__(self, pos, manager):
         super().__init__(
             pygame.Rect(pos, (RES[0] + 32, RES[1] + 20)),
@@ -1,4 +1,4 @@
-from .piano import Piano
+from .piano import Piano, load_samples
 
 
 def load(manager, params):
@@ -12,3 +12,10 @@ def load(manager, params):
         position = params[0]
 
     Piano(position, manager)
+
+
+def preload():
+    """
+    Decode the middle octave's samples ahead of load(), off the UI thread.
+    """
+    load_samples(1)
@@ -6,6 +6,8 @@ from pygame_gui.elements.ui_image import UIImage
 
 import os, time, random
 
+from runtime import assets
+
 BLACK = (0, 0, 0)
 WHITE = (255,255,255)
 BACKGROUND = WHITE
@@ -32,9 +34,31 @@ SIMONCOL = (
     WHITE,
     BLACK
 )  # colors when in Simon mode
+PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_samples(octave):
+    "Load instrument samples for an octave (0 low, 1 middle, 2 high). Safe on any thread"
+    if octave == 0:
+        o = "_low"
+    elif octave == 2:
+        o = "_high"
+    else:
+        o = ""
+    audio, sustain = {}, {}
+    for n in range(13):
+        audio[n] = assets.load_sound(PATH + "/snd/piano%s_%02u.ogg" % (o, n))
+        sustain[n] = assets.load_sound(PATH + "/snd/piano%s_sustain_%02u.ogg" % (o, n))
+    audio["buzz"] = assets.load_sound(PATH + "/snd/buzz.ogg")
+    return audio, sustain
 
 
 class Piano(pygame_gui.elements.UIWindow):
+    @property
+    def FRAME_RATE(self):
+        # Simon plays its melody without input; otherwise only input redraws.
+        return 30 if self.simon and self.simonplay else 0
+
     def __init__(self, pos, manager):
         self.res = 319, H+50
         super().__init__(
@@ -57,6 +81,10 @@ class Piano(pygame_gui.elements.UIWindow):
         self.volume = 5
         self.octave = 1
         self.sust = False
+        # ("audio" or "sustain", note) -> (channel, sound) of the notes
+        # playing. The samples are shared with other pianos, so volume and
+        # stopping go through the channels, never the sounds.
+        self.playing = {}
         self.load_inst()
         self.setvol()
         self.win = pygame.Surface(self.res)
@@ -74,28 +102,30 @@ class Piano(pygame_gui.elements.UIWindow):
 
     def load_inst(self):
         "Load instrument samples"
-        self.audio, self.sustain = {}, {}
-        if self.octave == 0:
-            o = "_low"
-        elif self.octave == 2:
-            o = "_high"
-        else:
-            o = ""
-        for n in range(13):
-            self.audio[n] = pygame.mixer.Sound(
-                self.path + "/snd/piano%s_%02u.ogg" % (o, n)
-            )
-            self.sustain[n] = pygame.mixer.Sound(
-                self.path + "/snd/piano%s_sustain_%02u.ogg" % (o, n)
-            )
-        self.audio["buzz"] = pygame.mixer.Sound(self.path + "/snd/buzz.ogg")
+        self.audio, self.sustain = load_samples(self.octave)
         self.setvol()
 
     def setvol(self):
-        "Set volume for all loaded sounds"
-        for n in range(13):
-            self.audio[n].set_volume(self.volume / 10)
-            self.sustain[n].set_volume(self.volume / 10)
+        "Set volume of the notes playing; new notes get it in start()"
+        for channel, sound in self.playing.values():
+            if channel.get_sound() is sound:
+                channel.set_volume(self.volume / 10)
+
+    def start(self, kind, k, loops=0):
+        "Play a sample of this piano at its volume"
+        # A looping sustain would be out of reach once its key is reused.
+        self.halt(kind, k)
+        sound = (self.audio if kind == "audio" else self.sustain)[k]
+        channel = sound.play(loops=loops)
+        if channel is not None:
+            channel.set_volume(self.volume / 10)
+            self.playing[(kind, k)] = (channel, sound)
+
+    def halt(self, kind, k):
+        "Stop a sample of this piano, if its channel still plays it"
+        channel, sound = self.playing.pop((kind, k), (None, None))
+        if channel is not None and channel.get_sound() is sound:
+            channel.stop()
 
     def setoct(self):
         "Change octave"
@@ -262,16 +292,16 @@ class Piano(pygame_gui.elements.UIWindow):
 
     def play(self, k, user=True):
         "Play a note"
-        self.audio[k].play()
+        self.start("audio", k)
         if user and self.sust:
-            self.sustain[k].play(loops=-1)
+            self.start("sustain", k, loops=-1)
         self.keys[k] = True
 
     def stop(self, k, user=True):
         "Stop playing a note"
         if self.sust:
-            self.audio[k].stop()
-        self.sustain[k].stop()
+            self.halt("audio", k)
+        self.halt("sustain", k)
         self.keys[k] = False
 
         # check if user melody matches Simon's
@@ -303,7 +333,7 @@ class Piano(pygame_gui.elements.UIWindow):
     def stopall(self):
         "Stop all notes"
         for k in range(13):
-            self.sustain[k].stop()
+            self.halt("sustain", k)
             self.keys[k] = False
 
     def draw_wkey(self, k, c):
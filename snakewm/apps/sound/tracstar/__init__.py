@@ -1,10 +1,11 @@
-from .tracstar import Tracstar
-
-
 def load(manager, params):
     """
     Create and launch a new instance of Tracstar.
     """
+    # Imported here, not at the top: the WM theme loads images from this
+    # package at startup, which would otherwise load the whole app.
+    from .tracstar import Tracstar
+
     # default position
     position = (0, 0)
 
@@ -12,3 +13,10 @@ def load(manager, params):
         position = params[0]
 
     Tracstar(position, manager)
+
+
+def preload():
+    """
+    Import the app ahead of load(), off the UI thread.
+    """
+    from . import tracstar  # noqa: F401
@@ -28,6 +28,12 @@ from .mixer import Mixer
 class Tracstar(pygame_gui.elements.UIPanel):
     """ A panel containing the tracstar music player. """
     DIMS = (400,240)
+    BACKGROUND_FRAME_RATE = 0  # the mixer keeps playing; only the magbar stops
+
+    @property
+    def FRAME_RATE(self):
+        # Matches the magbar animation timer; static unless music is playing.
+        return 10 if self.mixer.get_busy() and not self.is_paused else 0
 
     def __init__(self, pos, manager):
         """ Create a window for the tracstar music player interface. """
@@ -135,7 +141,7 @@ class Tracstar(pygame_gui.elements.UIPanel):
         )
 
         # Initialize magnetic tape "tractape."
-        self.animate_magbar : bool = False
+        self.animate_magbar : bool = True  # False while suspended, see on_suspend
         self.animation_magbar_frames : list = []
         self.animation_magbar_max : int = 10
         self.animation_magbar_counter : int = 0
@@ -404,8 +410,7 @@ class Tracstar(pygame_gui.elements.UIPanel):
         super().update(delta)
         # limit frame rate to 4 FPS
         if time.time() - self.last_time > 0.1: #0.25:
-            #if self.animate_magbar is True:
-            if self.mixer.get_busy() == True:
+            if self.animate_magbar and self.mixer.get_busy() == True:
                 if 0 <= self.animation_magbar_counter < self.animation_magbar_max:
                     self.surface_magbar.blit(self.animation_magbar_frames[self.animation_magbar_counter], (0, 0))
                     self.animation_magbar_counter += 1
@@ -415,6 +420,13 @@ class Tracstar(pygame_gui.elements.UIPanel):
                 self.magbar.set_image(self.surface_magbar)
                 self.last_time = time.time()
 
+    def on_suspend(self):
+        # The mixer keeps playing; only stop polling it for the magbar.
+        self.animate_magbar = False
+
+    def on_resume(self):
+        self.animate_magbar = True
+
     def kill(self):
         self.mixer.stop()
         super().kill()
@@ -1,10 +1,11 @@
-from .docs import Docs
-
-
 def load(manager, params):
     """
     Create and launch a new instance of Docs.
     """
+    # Imported here, not at the top: the WM theme loads images from this
+    # package at startup, which would otherwise load the whole app.
+    from .docs import Docs
+
     # default position
     pos = (0, 0)
 
@@ -12,3 +13,10 @@ def load(manager, params):
         pos = params[0]
 
     Docs(pos, manager)
+
+
+def preload():
+    """
+    Import the app ahead of load(), off the UI thread.
+    """
+    from . import docs  # noqa: F401
@@ -3,33 +3,29 @@
 
 import time
 
-o = 0
-t = time.time()
-numcpu = 1
-for l in open("/proc/stat"):
-    x = l.split()
-    if l[:3] == "cpu" and len(x[0]) > 3:
-        numcpu = 1 + int(x[0][3:])
+from .sampler import Sampler
+
+# Samples taken on the caller's thread, so each call covers the time
+# since the previous one. Snakeye itself reads the shared sampler.
+# Created on first use, so importing the module opens nothing.
+_sampler = None
 
 
 def cpulin():
-    global o, t
-    f = open("/proc/stat").readline().split()
-    q = 0.01 * (int(f[4]) - o) / (time.time() - t)
-    q = 100 * (1 - q / numcpu)
-    q = max(0, min(100, q))
-    t = time.time()
-    o = int(f[4])
-    return int(q)
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(capacity=1)
+    return _sampler.read().cpu
 
 
 def cpulin2():
-    #return str("cpu: <br>{}%".format(cpuproc()))
-    return str("cpu: {}%".format(cpuproc()))
+    #return str("cpu: <br>{}%".format(cpulin()))
+    return str("cpu: {}%".format(cpulin()))
 
 
-# Test the module
+# Test the module (from the snakewm directory):
+#   python3 -m apps.system.snakeye.cpulin
 if __name__ == "__main__":
     while True:
-        print(cpuproc())
+        print(cpulin2())
         time.sleep(1)
@@ -2,11 +2,16 @@
 graphs for pygame
 (c) 2022 Jason Zhang and CaseyHackerMan. MIT License.
 (c) 2024 Asa Durkee. Snakeware port.
+
+Plot draws a list of points on axes. The axes, ticks and labels are drawn
+once into a static layer, and redrawn only when the range or labels
+change. Point lists longer than the plot is wide are decimated to a
+min/max envelope, one column per pixel.
 """
 import pygame
 #from guipy.components._component import Component
 #from guipy.utils import *
-from math import *
+from math import ceil, floor, log10
 
 BLACK = ((0,)*3)
 WHITE = ((255,)*3)
@@ -25,9 +30,51 @@ def line(surf, points):
         last = p
 
 
-class Plot(pygame.Surface):
+def envelope(surf, points):
+    """
+    Plot style for decimated data: a vertical min/max line per column,
+    joined to the column before.
+
+    :param surf: Surface to draw to
+    :param points: List of (x, ymin, ymax) pixel columns, as from decimate()
+    """
+    last = None
+    for x, low, high in points:
+        top, bottom = low, high
+        if last is not None:
+            # Join to the previous column so steep edges stay connected.
+            top, bottom = min(low, last[1]), max(high, last[0])
+        pygame.draw.line(surf, BLACK, (x, top), (x, bottom), 1)
+        last = (low, high)
+
+
+def decimate(points):
+    """
+    Reduce pixel coordinates to one (x, ymin, ymax) per pixel column.
+
+    :param points: List of pixel coordinates, in x order. ex: [(1,1),(2,3),...]
+    :return: List of (x, ymin, ymax)
+    """
+    columns = []
+    for x, y in points:
+        if y is None:
+            continue
+        x = int(x)
+        if columns and columns[-1][0] == x:
+            column = columns[-1]
+            if y < column[1]:
+                column[1] = y
+            elif y > column[2]:
+                column[2] = y
+        else:
+            columns.append([x, y, y])
+    return columns
+
+
+class Plot:
     """
     Plot component. Simple and fast way to display data.
+    Draws to self.root.
     """
 
     def __init__(
@@ -62,8 +109,13 @@ class Plot(pygame.Surface):
         self.font = get_default_font()
         self.root = pygame.Surface((self.width, self.height)).convert_alpha()
         self.window = pygame.Surface((width - yaxis_width, height - xaxis_height))
+        self.window.fill(WHITE)
         self.windrect = self.window.get_rect().inflate(-5, -5)
 
+        # Axes, ticks and labels, and the range and labels they were drawn for.
+        self.static = pygame.Surface((self.width, self.height)).convert_alpha()
+        self.static_key = None
+
     def _x(self, x):  # coordinate to pixel
         return translate(
             x, self.xmin, self.xmax, self.windrect.left, self.windrect.right
@@ -74,11 +126,12 @@ class Plot(pygame.Surface):
             y, self.ymax, self.ymin, self.windrect.top, self.windrect.bottom
         )
 
-    def _draw(self):
+    def _draw_static(self):
+        """ Draw the axes, ticks and labels into the static layer. """
         w = self.window.get_width()
         h = self.window.get_height()
 
-        self.root.fill(WHITE)
+        self.static.fill(WHITE)
         if self.range_set:
 
             # draw x-axis
@@ -94,10 +147,10 @@ class Plot(pygame.Surface):
                     p2 = (x, h + self.long_tick)
                     n = float_format(i * res, scale)
                     num = self.font.render(n, True, BLACK)
-                    self.root.blit(num, p2)
+                    self.static.blit(num, p2)
                 else:
                     p2 = (x, h + self.short_tick)
-                pygame.draw.line(self.root, BLACK, (x, h), p2, 1)
+                pygame.draw.line(self.static, BLACK, (x, h), p2, 1)
                 i += 1
 
             # draw y-axis
@@ -112,22 +165,36 @@ class Plot(pygame.Surface):
                 if i % 10 == 0:
                     p2 = (w + self.long_tick, y)
                     n = float_format(i * res, scale)
-                    self.root.blit(self.font.render(n, True, BLACK), p2)
+                    self.static.blit(self.font.render(n, True, BLACK), p2)
                 else:
                     p2 = (w + self.short_tick, y)
-                pygame.draw.line(self.root, BLACK, (w, y), p2, 1)
+                pygame.draw.line(self.static, BLACK, (w, y), p2, 1)
                 i += 1
 
         if not self.xlabel == None:
             label = self.font.render(self.xlabel, True, BLACK)
             p = ((w - label.get_width()) / 2, self.height - label.get_height())
-            self.root.blit(label, p)
+            self.static.blit(label, p)
 
         if not self.ylabel == None:
             label = self.font.render(self.ylabel, True, BLACK)
             label = pygame.transform.rotate(label, 90)
             p = (self.width - label.get_width(), (h - label.get_height()) / 2)
-            self.root.blit(label, p)
+            self.static.blit(label, p)
+
+    def _draw(self, full=True):
+        """
+        Compose the plot into self.root.
+        :param full: also redraw the static layer onto root; only the
+                     data window is blitted otherwise
+        """
+        key = (self.xmin, self.xmax, self.ymin, self.ymax, self.xlabel, self.ylabel)
+        if key != self.static_key:
+            self.static_key = key
+            self._draw_static()
+            full = True
+        if full:
+            self.root.blit(self.static, (0, 0))
 
         for i in range(len(self.points)):
             self.styles[i](self.window, self.points[i])
@@ -164,7 +231,12 @@ class Plot(pygame.Surface):
         :return: True is the range is valid
         """
         if self.range_set:
-            self.points.append(list((self._x(d[0]), self._y(d[1])) for d in data))
+            points = list((self._x(d[0]), self._y(d[1])) for d in data)
+            if len(points) > 2 * self.windrect.width:
+                # More points than pixels: draw each column's extent instead.
+                points = decimate(points)
+                style = envelope
+            self.points.append(points)
             self.styles.append(style)
         return self.range_set
 
@@ -175,7 +247,7 @@ class Plot(pygame.Surface):
         :param rel_mouse: Relative mouse position
         :param events: Pygame Event list
         """
-        self._draw()
+        self._draw(full=False)
         self.window.fill(WHITE)
         self.points = []
         self.styles = []
@@ -0,0 +1,187 @@
+"""
+history: fixed-size ring buffer of timestamped samples, and sparklines
+drawn from it.
+
+History keeps one array('d') per metric, preallocated: an hour of samples
+is about 115 kB per metric, and appending never allocates. Missing readings are stored
+as NaN. The buffer can be queried per metric, and exported as CSV.
+
+Sparkline draws one metric as a rolling bar graph. Each new sample
+scrolls the graph by one pixel and draws only the new row.
+"""
+
+import array
+import csv
+import math
+import threading
+
+import pygame
+
+# Samples kept: an hour at the sampler's 4 samples a second.
+CAPACITY = 4 * 60 * 60
+
+BLACK = ((0,)*3)
+WHITE = ((255,)*3)
+
+
+class History:
+    """ Ring buffer of samples, one column per metric. """
+
+    def __init__(self, metrics, capacity=CAPACITY):
+        """
+        metrics - names of the values kept with each sample
+        capacity - samples kept; the oldest are dropped past it
+        """
+        self.capacity = capacity
+        self.times = array.array("d", bytes(8 * capacity))
+        self.columns = {}
+        for name in metrics:
+            self.add_metric(name)
+        # Index the next sample goes to, and samples held.
+        self.head = 0
+        self.count = 0
+        # Samples appended since creation, so readers can tell what is new.
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def add_metric(self, name):
+        """ Start keeping 'name'. Its value in earlier samples is NaN. """
+        if name not in self.columns:
+            self.columns[name] = array.array("d", [math.nan]) * self.capacity
+
+    @property
+    def metrics(self):
+        return list(self.columns)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, when, values):
+        """
+        Add a sample.
+        when - time of the sample, in seconds
+        values - metric name -> value; metrics not given are NaN
+        """
+        with self.lock:
+            for name in values:
+                if name not in self.columns:
+                    self.add_metric(name)
+            i = self.head
+            self.times[i] = when
+            for name, column in self.columns.items():
+                value = values.get(name)
+                column[i] = math.nan if value is None else value
+            self.head = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.total += 1
+
+    def _indices(self, count):
+        count = self.count if count is None else min(count, self.count)
+        start = self.head - count
+        return [(start + i) % self.capacity for i in range(count)]
+
+    def values(self, name, count=None):
+        """ The last 'count' values of 'name' (all by default), oldest first. """
+        with self.lock:
+            column = self.columns.get(name)
+            if column is None:
+                return []
+            return [column[i] for i in self._indices(count)]
+
+    def recent(self, name, count):
+        """ (samples appended so far, the last 'count' values of 'name'), read together. """
+        with self.lock:
+            column = self.columns.get(name)
+            if column is None:
+                return self.total, []
+            return self.total, [column[i] for i in self._indices(count)]
+
+    def latest(self, name):
+        """ The newest value of 'name', or NaN. """
+        with self.lock:
+            column = self.columns.get(name)
+            if column is None or self.count == 0:
+                return math.nan
+            return column[self.head - 1]
+
+    def rows(self, count=None):
+        """ The last 'count' samples, oldest first, as (time, [values in metrics order]). """
+        with self.lock:
+            columns = list(self.columns.values())
+            return [(self.times[i], [column[i] for column in columns])
+                    for i in self._indices(count)]
+
+    def export_csv(self, path):
+        """ Write every sample held to 'path' as CSV, with a header row. """
+        metrics = self.metrics
+        rows = self.rows()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time"] + metrics)
+            for when, values in rows:
+                writer.writerow([when] + ["" if math.isnan(v) else v for v in values])
+
+
+class Sparkline:
+    """ Rolling bar graph of one metric: newest sample on top, one row each. """
+
+    def __init__(self, size, metric, high=100, anchor="left"):
+        """
+        size - (width, height) of the graph in pixels
+        metric - name of the History metric drawn
+        high - value drawn as a full-width bar, or None to scale to the
+               largest value on the graph
+        anchor - side the bars grow from, "left" or "right"
+        """
+        self.surface = pygame.Surface(size)
+        self.surface.fill(WHITE)
+        self.metric = metric
+        self.high = high
+        self.anchor = anchor
+        # History.total as of the last row drawn.
+        self.drawn = 0
+        self.scale = high
+
+    def update(self, history):
+        """
+        Draw the samples added to 'history' since the last call.
+        Returns True if the graph changed.
+        """
+        if history.total == self.drawn:
+            return False
+        height = self.surface.get_height()
+        total, values = history.recent(self.metric, height)
+        new = total - self.drawn
+        self.drawn = total
+
+        full = new >= height
+        if self.high is None:
+            visible = [v for v in values if not math.isnan(v)]
+            scale = max(visible) if visible else 0
+            if scale != self.scale:
+                # The scale changed: every row is out of date.
+                self.scale = scale
+                full = True
+
+        if full:
+            self.surface.fill(WHITE)
+        else:
+            values = values[-new:]
+            self.surface.scroll(dy=len(values))
+        # Newest sample on the top row.
+        for row, value in enumerate(reversed(values)):
+            self.draw_row(row, value)
+        return True
+
+    def draw_row(self, y, value):
+        width = self.surface.get_width()
+        pygame.draw.line(self.surface, WHITE, (0, y), (width - 1, y))
+        if math.isnan(value) or not self.scale:
+            return
+        length = round(min(1.0, max(0.0, value / self.scale)) * width)
+        if length <= 0:
+            return
+        if self.anchor == "right":
+            pygame.draw.line(self.surface, BLACK, (width - length, y), (width - 1, y))
+        else:
+            pygame.draw.line(self.surface, BLACK, (0, y), (length - 1, y))
@@ -0,0 +1,117 @@
+"""
+procs: CPU time of the WM's threads, grouped by the app they belong to.
+
+ProcessMonitor reads /proc/self/task/*/stat, each file kept open and
+re-read with os.pread(), and turns the user and system jiffies each
+thread spent since the last read into a CPU percent. Threads are grouped
+by app with runtime.appstats; each app's row also carries the resident
+memory its preload and last start added. Work an app does in its
+update() and event handlers runs on the WM's main thread, and counts as
+the WM's. The shared sampler reads it every few seconds on its worker
+thread.
+"""
+
+import os
+import threading
+import time
+
+from runtime import appstats
+
+PROC_SELF_TASK = "/proc/self/task"
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def parse_task_stat(text):
+    """ (thread name, user + system jiffies) from a task's stat file. """
+    # The name is in parentheses and may hold spaces and parentheses.
+    start = text.index("(")
+    end = text.rindex(")")
+    fields = text[end + 2:].split()
+    # utime and stime are fields 14 and 15; 'fields' starts at field 3.
+    return text[start + 1:end], int(fields[11]) + int(fields[12])
+
+
+class AppUsage:
+    """ One row of the process view. """
+
+    def __init__(self, app):
+        self.app = app
+        # CPU percent of one core, summed over the app's threads.
+        self.cpu = 0.0
+        self.rss = appstats.LOAD_RSS.get(app, 0)
+        # Thread names, busiest first.
+        self.threads = []
+
+    @property
+    def name(self):
+        """ Short name: "voicebox" for "apps.sound.voicebox". """
+        return self.app.rsplit(".", 1)[-1]
+
+
+class ProcessMonitor:
+    """ Per-thread CPU use of the WM process, grouped by app. """
+
+    def __init__(self):
+        # Thread id -> open stat file descriptor, and -> jiffies last read.
+        self.fds = {}
+        self.jiffies = {}
+        self.last_time = None
+        # AppUsage rows from the last read, most expensive first.
+        self.usage = []
+        # Apps with a window open, set by the UI thread. They get a row
+        # even when all their work is on the WM's main thread.
+        self.open_apps = set()
+
+    def read(self):
+        """ Read every thread once. Returns the rows, most expensive first. """
+        now = time.monotonic()
+        elapsed = None if self.last_time is None else now - self.last_time
+        self.last_time = now
+
+        rows = {app: AppUsage(app) for app in self.open_apps}
+        # Python threads go by their own names; the kernel only knows "python3".
+        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+        seen = set()
+        for name in os.listdir(PROC_SELF_TASK):
+            tid = int(name)
+            try:
+                fd = self.fds.get(tid)
+                if fd is None:
+                    fd = os.open(os.path.join(PROC_SELF_TASK, name, "stat"), os.O_RDONLY)
+                    self.fds[tid] = fd
+                thread_name, jiffies = parse_task_stat(os.pread(fd, 1024, 0).decode(errors="replace"))
+            except (OSError, ValueError, IndexError):
+                # The thread exited while being read.
+                continue
+            seen.add(tid)
+
+            spent = jiffies - self.jiffies.get(tid, jiffies)
+            self.jiffies[tid] = jiffies
+            cpu = 0.0
+            if elapsed:
+                cpu = 100.0 * spent / CLOCK_TICKS / elapsed
+
+            app = appstats.thread_app(tid)
+            row = rows.get(app)
+            if row is None:
+                row = rows[app] = AppUsage(app)
+            row.cpu += cpu
+            row.threads.append((cpu, names.get(tid, thread_name)))
+
+        for tid in [tid for tid in self.fds if tid not in seen]:
+            os.close(self.fds.pop(tid))
+            self.jiffies.pop(tid, None)
+            appstats.forget_thread(tid)
+
+        for row in rows.values():
+            row.threads = [name for cpu, name in sorted(row.threads, reverse=True)]
+        self.usage = sorted(rows.values(), key=lambda row: (row.cpu, row.rss), reverse=True)
+        return self.usage
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+        self.jiffies = {}
+        self.last_time = None
@@ -3,33 +3,30 @@
 
 import time
 
+from .sampler import Sampler
 
-def isolate_num(text):
-    digits = ""
-    for c in text:
-        if c in "0123456789":
-            digits += c
-    return int(digits)
+# Created on first use, so importing the module opens nothing.
+_sampler = None
 
 
-def ramlin():
-    file = open("/proc/meminfo").read().split("\n")
+def _read():
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(capacity=1)
+    return _sampler.read()
+
 
-    total = isolate_num(file[0])
-    used = total - isolate_num(file[2])  # uses memavaiable line
-    perc = round((used / total) * 100)
-    return perc
+def ramlin():
+    return _read().mem_percent
 
 
 def ramproc2():
-    file = open("/proc/meminfo").read().split("\n")
-
-    total = isolate_num(file[0])
-    used = total - isolate_num(file[2])  # uses memavailable line
-    return "mem: <br>{}/<br>{}".format(used, total)
+    sample = _read()
+    return "mem: <br>{}/<br>{}".format(sample.mem_used, sample.mem_total)
 
 
-# Test the module
+# Test the module (from the snakewm directory):
+#   python3 -m apps.system.snakeye.ramlin
 if __name__ == "__main__":
     while True:
         print(ramproc2())
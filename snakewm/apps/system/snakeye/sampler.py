@@ -0,0 +1,305 @@
+"""
+sampler: CPU and memory samples from /proc, shared by everything that
+shows them (Linux only).
+
+/proc/stat, /proc/meminfo and the other files read are opened once and
+re-read in place with os.pread(). CPU usage is the busy share of all
+jiffies spent since the previous sample, for the whole system and for
+each core. Sampling runs on a worker thread at a fixed INTERVAL while
+anyone uses the sampler:
+
+    sampler = shared_sampler()
+    sampler.acquire()
+    sample = sampler.latest()   # None until the first sample is in
+    ...
+    sampler.release()
+
+Every sample is also kept in sampler.history (see history.py), under the
+metric names in Sample.metrics(); sampler.history.export_csv(path) saves
+a session for analysis. Every few seconds the worker also reads the CPU
+use of the WM's threads by app into sampler.procs.usage (see procs.py).
+"""
+
+import glob
+import os
+import threading
+import time
+
+from runtime.metrics import BEEPY_BATTERY
+
+from .history import History, CAPACITY
+from .procs import ProcessMonitor
+
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+PROC_LOADAVG = "/proc/loadavg"
+PROC_SELF_STATM = "/proc/self/statm"
+THERMAL_ZONES = "/sys/class/thermal/thermal_zone*/temp"
+
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+# Seconds between samples.
+INTERVAL = 0.25
+
+# The WM's threads are read once every this many samples.
+PROCESS_EVERY = 8
+
+
+class ProcFile:
+    """ A /proc file kept open, and re-read from the start with os.pread(). """
+
+    CHUNK = 4096
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self, stop=None):
+        """
+        The file's contents, as text.
+        stop - stop reading once this text has been read, for files
+               where only the first lines are wanted
+        """
+        data = b""
+        while True:
+            chunk = os.pread(self.fd, self.CHUNK, len(data))
+            data += chunk
+            if len(chunk) < self.CHUNK or (stop is not None and stop in chunk):
+                return data.decode("ascii", errors="replace")
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def parse_stat(text):
+    """
+    The cpu lines of /proc/stat, as name -> (busy jiffies, total jiffies).
+    'cpu' is the whole system, 'cpu0', 'cpu1'... the cores.
+    """
+    cpus = {}
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            break
+        fields = line.split()
+        # user nice system idle iowait irq softirq steal; guest time is
+        # already counted in user and nice.
+        jiffies = [int(field) for field in fields[1:9]]
+        total = sum(jiffies)
+        idle = jiffies[3] + (jiffies[4] if len(jiffies) > 4 else 0)
+        cpus[fields[0]] = (total - idle, total)
+    return cpus
+
+
+def parse_meminfo(text):
+    """ /proc/meminfo as field name -> kB. """
+    fields = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        value = value.split()
+        if value:
+            fields[name] = int(value[0])
+    return fields
+
+
+def busy_percent(old, new):
+    """ Busy percent between two (busy, total) jiffy counts. """
+    total = new[1] - old[1]
+    if total <= 0:
+        return 0
+    return max(0, min(100, round(100 * (new[0] - old[0]) / total)))
+
+
+class Sample:
+    """ One reading of CPU and memory use. """
+
+    def __init__(self, when, cpu, cores, meminfo, load=None, temp=None, battery=None, rss=None):
+        """
+        when - time.monotonic() of the reading
+        cpu - busy percent of the whole system since the previous sample
+        cores - busy percent of each core, in core order
+        meminfo - /proc/meminfo fields, in kB
+        load - one minute load average
+        temp - temperature of the first thermal zone, in degrees C
+        battery - battery charge in percent
+        rss - resident memory of the WM process, in kB
+        (None where there is no reading)
+        """
+        self.time = when
+        self.cpu = cpu
+        self.cores = cores
+        self.meminfo = meminfo
+        self.load = load
+        self.temp = temp
+        self.battery = battery
+        self.rss = rss
+
+        self.mem_total = meminfo.get("MemTotal", 0)
+        available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+        self.mem_used = self.mem_total - available
+        self.swap_total = meminfo.get("SwapTotal", 0)
+        self.swap_used = self.swap_total - meminfo.get("SwapFree", 0)
+
+    @property
+    def mem_percent(self):
+        if self.mem_total <= 0:
+            return 0
+        return round(100 * self.mem_used / self.mem_total)
+
+    @property
+    def swap_percent(self):
+        if self.swap_total <= 0:
+            return 0
+        return round(100 * self.swap_used / self.swap_total)
+
+    def metrics(self):
+        """ The sample as History metric name -> value. """
+        values = {
+            "cpu": self.cpu,
+            "mem": self.mem_percent,
+            "swap": self.swap_percent,
+            "load": self.load,
+            "temp": self.temp,
+            "battery": self.battery,
+            "rss": self.rss,
+        }
+        for i, busy in enumerate(self.cores):
+            values["cpu" + str(i)] = busy
+        return values
+
+
+class Sampler:
+    """ Samples /proc on a worker thread while it has users. """
+
+    def __init__(self, interval=INTERVAL, capacity=CAPACITY):
+        """
+        interval - seconds between samples
+        capacity - samples kept in the history
+        """
+        self.interval = interval
+        self.stat = None
+        self.meminfo = None
+        # Optional files, None when missing.
+        self.optional = {}
+        # /proc/stat cpu lines as of the previous sample.
+        self.last_cpus = {}
+        self.sample = None
+        self.history = History(["cpu", "mem", "swap", "load", "temp", "battery", "rss"], capacity)
+        # Per-app CPU use of the WM, read by the worker every PROCESS_EVERY samples.
+        self.procs = ProcessMonitor()
+        self.samples = 0
+
+        self.users = 0
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def acquire(self):
+        """ Start sampling, if this is the first user. """
+        with self.cond:
+            self.users += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.work, name="snakeye-sampler", daemon=True)
+                self.thread.start()
+
+    def release(self):
+        """ Stop sampling once the last user is gone. """
+        with self.cond:
+            self.users = max(0, self.users - 1)
+            self.cond.notify()
+
+    def latest(self):
+        """ The most recent Sample, or None before the first one. Never blocks. """
+        return self.sample
+
+    def read(self):
+        """ Take a sample now, on the calling thread, and return it. """
+        if self.stat is None:
+            self.stat = ProcFile(PROC_STAT)
+            self.meminfo = ProcFile(PROC_MEMINFO)
+            zones = sorted(glob.glob(THERMAL_ZONES))
+            for name, path in (("load", PROC_LOADAVG), ("statm", PROC_SELF_STATM),
+                               ("temp", zones[0] if zones else None),
+                               ("battery", BEEPY_BATTERY)):
+                try:
+                    self.optional[name] = ProcFile(path) if path else None
+                except OSError:
+                    self.optional[name] = None
+        cpus = parse_stat(self.stat.read(stop=b"intr"))
+        meminfo = parse_meminfo(self.meminfo.read())
+        load = self.read_field("load", 0, float)
+        temp = self.read_field("temp", 0, int)
+        if temp is not None:
+            temp = temp / 1000
+        rss = self.read_field("statm", 1, int)
+        if rss is not None:
+            rss *= PAGE_KB
+
+        last = self.last_cpus or cpus
+        self.last_cpus = cpus
+        cores = []
+        i = 0
+        while "cpu" + str(i) in cpus:
+            name = "cpu" + str(i)
+            cores.append(busy_percent(last.get(name, cpus[name]), cpus[name]))
+            i += 1
+        cpu = busy_percent(last.get("cpu", cpus["cpu"]), cpus["cpu"])
+
+        battery = self.read_field("battery", 0, int)
+        sample = Sample(time.monotonic(), cpu, cores, meminfo, load, temp, battery, rss)
+        self.history.append(sample.time, sample.metrics())
+        self.sample = sample
+        return sample
+
+    def read_field(self, name, index, kind):
+        """ Field 'index' of an optional file, converted with 'kind', or None. """
+        proc_file = self.optional.get(name)
+        if proc_file is None:
+            return None
+        try:
+            return kind(proc_file.read().split()[index])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def close(self):
+        for proc_file in [self.stat, self.meminfo] + list(self.optional.values()):
+            if proc_file is not None:
+                proc_file.close()
+        self.stat = None
+        self.meminfo = None
+        self.optional = {}
+        self.last_cpus = {}
+        self.procs.close()
+
+    def work(self):
+        """ Worker thread: sample every 'interval' seconds while there are users. """
+        while True:
+            started = time.monotonic()
+            try:
+                self.read()
+                if self.samples % PROCESS_EVERY == 0:
+                    self.procs.read()
+                self.samples += 1
+            except (OSError, ValueError, KeyError) as e:
+                print("ERROR: snakeye could not sample /proc: " + repr(e))
+                self.close()
+            with self.cond:
+                if self.users > 0:
+                    self.cond.wait(max(0.0, self.interval - (time.monotonic() - started)))
+                if self.users == 0:
+                    self.thread = None
+                    self.close()
+                    return
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_sampler():
+    """ The sampler every snakeye window and widget shares. """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Sampler()
+        return _shared
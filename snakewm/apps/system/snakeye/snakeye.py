@@ -3,29 +3,33 @@ import time
 import pygame
 import pygame_gui
 from pygame_gui.core import ObjectID
+from pygame_gui.elements.ui_button import UIButton
 from pygame_gui.elements.ui_image import UIImage
 from pygame_gui.elements.ui_label import UILabel
 from pygame_gui.elements.ui_window import UIWindow
 
+from .history import History, Sparkline
+
 if platform.system() == 'Darwin':
     print('DEBUG: Running on macOS.')
     from .rammac import rammac as ram_check
     from .cpumac import cpumac as cpu_check
 elif platform.system() == 'Linux':
     print('DEBUG: Running on Linux.')
-    from .ramlin import ramlin as ram_check
-    from .cpulin import cpulin as cpu_check
+    from .sampler import shared_sampler
+    from runtime import appstats
 else:
     print('ERROR: Cannot detect platform. Maybe Windows?')
     exit
 
-BLACK = ((0,)*3)
-WHITE = ((255,)*3)
-
 class Snakeye(UIWindow):
     DIMS = (100,180)
+    FRAME_RATE = 4
+    BACKGROUND_FRAME_RATE = 1  # redraw once a second while another window has focus
+    OCCLUDED = False
     LABELHEIGHT = 20
-    GRAPHDIMS = (round(DIMS[0]/2),DIMS[1]-LABELHEIGHT)
+    GRAPHDIMS = (round(DIMS[0]/2),DIMS[1]-2*LABELHEIGHT)
+    PROC_ROWS = (DIMS[1]-LABELHEIGHT)//LABELHEIGHT
     print('GRAPHDIMS: ' + str(GRAPHDIMS))
 
     def __init__(self, position, manager):
@@ -57,8 +61,7 @@ class Snakeye(UIWindow):
         )
 
         self.image_cpu = UIImage(
-            relative_rect=pygame.Rect(0,self.LABELHEIGHT,
-                                      self.DIMS[0]/2,self.DIMS[1]-self.LABELHEIGHT),
+            relative_rect=pygame.Rect((0,self.LABELHEIGHT), self.GRAPHDIMS),
             image_surface=pygame.Surface((30,30)),
             #image_surface=pygame.Surface(pygame.Rect(self.DIMS[0]/2,self.DIMS[1]-24)).convert(),
             manager=manager,
@@ -67,8 +70,7 @@ class Snakeye(UIWindow):
         )
 
         self.image_ram = UIImage(
-            relative_rect=pygame.Rect(self.DIMS[0]/2+2,self.LABELHEIGHT,
-                                      self.DIMS[0]/2,self.DIMS[1]-self.LABELHEIGHT),
+            relative_rect=pygame.Rect((self.DIMS[0]/2+2,self.LABELHEIGHT), self.GRAPHDIMS),
             image_surface=pygame.Surface((30,30)),
             #image_surface=pygame.Surface(pygame.Rect(self.DIMS[0]/2,self.DIMS[1]-24)).convert(),
             manager=manager,
@@ -76,64 +78,124 @@ class Snakeye(UIWindow):
             parent_element=self,
         )
 
-        self.cpu = pygame.Surface(self.GRAPHDIMS)
-        self.cpu.fill(WHITE)
-        self.ram = pygame.Surface(self.GRAPHDIMS)
-        self.ram.fill(WHITE)
+        # Rolling graphs, drawn from the sample history.
+        self.cpu_graph = Sparkline(self.GRAPHDIMS, "cpu", anchor="right")
+        self.ram_graph = Sparkline(self.GRAPHDIMS, "mem")
         self.last_time = 0
 
+        # On Linux, samples come from the shared sampler's worker thread,
+        # and its history goes back to before this window was opened.
+        self.sampler = None
+        self.sampling = False
+        if platform.system() == 'Linux':
+            self.sampler = shared_sampler()
+            self.sampler.acquire()
+            self.sampling = True
+            self.history = self.sampler.history
+        else:
+            self.history = History(["cpu", "mem"])
+
+        # Process view: the apps costing the most, in place of the graphs.
+        self.proc_rows = []
+        self.button_procs = None
+        self.showing_procs = False
+        self.shown_usage = None
+        if self.sampler is not None:
+            for i in range(self.PROC_ROWS):
+                row = UILabel(
+                    relative_rect=pygame.Rect(0,i*self.LABELHEIGHT,  self.DIMS[0],self.LABELHEIGHT),
+                    text="",
+                    manager=manager,
+                    container=self,
+                    parent_element=self,
+                    object_id=ObjectID(class_id="@snakeye_label",object_id="#snakeye_label_proc")
+                )
+                row.hide()
+                self.proc_rows.append(row)
+            self.button_procs = UIButton(
+                relative_rect=pygame.Rect(0,self.DIMS[1]-self.LABELHEIGHT,  self.DIMS[0],self.LABELHEIGHT),
+                text="apps",
+                manager=manager,
+                container=self,
+                parent_element=self,
+                object_id=ObjectID(class_id="@snakeye_button",object_id="#snakeye_button_procs")
+            )
+
+    def kill(self):
+        self.set_sampling(False)
+        self.sampler = None
+        super().kill()
+
+    def on_suspend(self):
+        # Keep sampling in the background, so the graphs and the apps view
+        # stay current while another window has focus; stop once covered.
+        self.set_sampling(not self.OCCLUDED)
+
+    def on_resume(self):
+        self.set_sampling(True)
+
+    def set_sampling(self, sampling):
+        """ Use the shared sampler, or let it stop polling /proc. """
+        if self.sampler is None or sampling == self.sampling:
+            return
+        if sampling:
+            self.sampler.acquire()
+        else:
+            self.sampler.release()
+        self.sampling = sampling
+
     def process_event(self, event):
         super().process_event(event)
+        if (event.type == pygame.USEREVENT
+                and event.user_type == pygame_gui.UI_BUTTON_PRESSED
+                and event.ui_element == self.button_procs):
+            self.show_procs(not self.showing_procs)
+
+    def show_procs(self, showing):
+        """ Switch between the graphs and the process view. """
+        self.showing_procs = showing
+        self.button_procs.set_text("graphs" if showing else "apps")
+        graphs = (self.label_cpu, self.label_ram, self.image_cpu, self.image_ram)
+        for element in self.proc_rows if showing else graphs:
+            element.show()
+        for element in graphs if showing else self.proc_rows:
+            element.hide()
+        self.shown_usage = None
 
     def update(self, delta):
         super().update(delta)
-        # limit frame rate to 4 FPS
-        if time.time() - self.last_time > 0.25:
-            self.draw_cpu()
-            self.draw_ram()
-            self.image_cpu.image.blit(self.cpu, (0, 0))
-            self.image_ram.image.blit(self.ram, (0, 0))
+        # Covered or uncovered while in the background, when no hook is
+        # called; updates still come at BACKGROUND_FRAME_RATE.
+        self.set_sampling(not self.OCCLUDED)
+        # limit frame rate to 4 FPS, and stop drawing while covered
+        if not self.OCCLUDED and time.time() - self.last_time > 0.25:
+            if self.sampler is None:
+                self.history.append(time.monotonic(), {"cpu": cpu_check(), "mem": ram_check()})
+            if self.showing_procs:
+                self.draw_procs()
+            # Only the rows for new samples are drawn.
+            if self.cpu_graph.update(self.history):
+                self.image_cpu.image.blit(self.cpu_graph.surface, (0, 0))
+            if self.ram_graph.update(self.history):
+                self.image_ram.image.blit(self.ram_graph.surface, (0, 0))
             self.last_time = time.time()
 
-    def draw_cpu(self):
-        """ Draw rolling graph for CPU. """
-        cpu_percentage = cpu_check()
-        #print("DEBUG: cpu_percentage: " + str(cpu_percentage) + " %")
-        self.cpu.scroll(dy=1)
-        # first, clear background to white
-        pygame.draw.line(
-            surface=self.cpu,
-            color=WHITE,
-            start_pos=(0,0),
-            end_pos=(self.GRAPHDIMS[0],0)
-        )
-        # second, draw cpu usage
-        pygame.draw.line(
-            surface=self.cpu,
-            color=BLACK,
-            start_pos=((self.GRAPHDIMS[0],0)),
-            end_pos=(self.GRAPHDIMS[0]-round(cpu_percentage * (self.GRAPHDIMS[0]/100)),0),
-            width=1,
-        )
-
-    def draw_ram(self):
-        """ Draw rolling graph for RAM. """
-        ram_percentage = ram_check()
-        self.ram.scroll(dy=1)
-        # first, clear background to white
-        pygame.draw.line(
-            surface=self.ram,
-            color=WHITE,
-            start_pos=(10,0),
-            end_pos=(20,0),
-            width=1
-            #end_pos=(self.GRAPHDIMS[0],0)
-        )
-        # second, draw ram consumption
-        pygame.draw.line(
-            surface=self.ram,
-            color=BLACK,
-            start_pos=(0,0),
-            end_pos=(round(ram_percentage * (self.GRAPHDIMS[0]/100)),0),
-            width=1,
-        )
+    def draw_procs(self):
+        """ Show the latest per-app usage, if it changed. """
+        procs = self.sampler.procs
+        # Apps with a window open; read here, on the UI thread.
+        procs.open_apps = {app for app in (appstats.app_name(type(window).__module__)
+                                           for window in self.ui_manager.get_window_stack().stack)
+                           if app is not None}
+        usage = procs.usage
+        if usage is self.shown_usage:
+            return
+        self.shown_usage = usage
+        for i, label in enumerate(self.proc_rows):
+            text = ""
+            if i < len(usage):
+                row = usage[i]
+                rss = str(round(row.rss / 1024)) + "M" if row.rss >= 1024 else str(row.rss) + "k"
+                text = row.name[:8] + " " + str(round(row.cpu)) + "% " + rss
+            if label.text != text:
+                label.set_text(text)
@@ -0,0 +1,270 @@
+"""
+Headless benchmark harness for snakewm.
+
+Runs the real SnakeWM main loop under SDL's dummy video and audio drivers,
+feeds it a scripted input stream (see scenarios.py), and reports frame
+time percentiles, peak RSS and CPU time for each scenario. gpiozero uses
+the mock pin factory wm.py sets up off the Pi, so no beepy is needed.
+
+Usage (from the glowfire directory):
+    python3 -m snakewm.bench                       # every scenario
+    python3 -m snakewm.bench castle --seconds 30   # some scenarios
+    python3 -m snakewm.bench --save-baseline       # store the results
+
+Results are compared against snakewm/bench/baseline.json, if it exists,
+and the exit status is 1 if a metric got worse by more than the tolerance.
+Each scenario runs in its own process, with an empty cache directory, so
+peak RSS and CPU time belong to that scenario alone.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pygame
+
+from .scenarios import SCENARIOS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against the baseline, with the absolute change that is
+# always treated as noise.
+METRICS = {
+    "p50_ms": 0.5,
+    "p90_ms": 0.5,
+    "p99_ms": 1.0,
+    "cpu_s": 0.1,
+    "rss_mb": 2.0,
+}
+TOLERANCE = 0.2
+
+# Prefix of the result line a scenario process prints.
+RESULT_PREFIX = "BENCH "
+
+
+class ScriptDone(Exception):
+    """ Raised out of the main loop when the script has finished. """
+
+
+def percentile(values, p):
+    """ Nearest-rank percentile of a list of numbers. """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def make_scheduler(steps):
+    """
+    Return a FrameScheduler that runs the scripted steps and times frames.
+    Imported late: the scheduler module needs pygame set up by the WM.
+    """
+    from snakewm.runtime.scheduler import FrameScheduler
+
+    class ScriptedScheduler(FrameScheduler):
+        """
+        The WM's frame scheduler, plus: runs due script steps at the start
+        of each frame, wakes up in time for the next one, and records how
+        long each frame took (time between next_frame() calls, minus sleep).
+        """
+
+        def __init__(self, steps):
+            super().__init__()
+            self.steps = list(steps)
+            self.start = None
+            self.frame_start = None
+            self.frame_times = []
+            self.first_frame = None
+            self.cpu_start = None
+
+        def target_rate(self, requested=0):
+            rate = super().target_rate(requested)
+            if self.start is not None and self.steps:
+                due = self.steps[0][0] - (time.perf_counter() - self.start)
+                if due > 0:
+                    rate = max(rate, min(self.active_fps, 1.0 / due))
+                else:
+                    rate = self.active_fps
+            return rate
+
+        def next_frame(self, requested=0):
+            now = time.perf_counter()
+            if self.frame_start is not None:
+                self.frame_times.append(now - self.frame_start)
+            if self.start is None and self.frame_start is not None:
+                # The first frame is on screen. The script starts now.
+                self.start = now
+                self.first_frame = now
+                self.cpu_start = cpu_time()
+
+            delta, events = super().next_frame(requested)
+            self.frame_start = time.perf_counter()
+
+            if self.start is not None:
+                elapsed = self.frame_start - self.start
+                while self.steps and self.steps[0][0] <= elapsed:
+                    action = self.steps.pop(0)[1]
+                    if action is None:
+                        raise ScriptDone()
+                    action(self.wm)
+            return delta, events
+
+    return ScriptedScheduler(steps)
+
+
+def cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_scenario(name, seconds):
+    """ Run one scenario in this process and return its results. """
+    from snakewm import wm as wm_module
+
+    started = time.perf_counter()
+    wm = wm_module.SnakeWM()
+    scheduler = make_scheduler(sorted(SCENARIOS[name](seconds), key=lambda step: step[0]))
+    scheduler.wm = wm
+    try:
+        wm.run(scheduler)
+    except ScriptDone:
+        pass
+
+    # The first frame includes startup work, so it is left out.
+    frames = [t * 1000 for t in scheduler.frame_times[1:]]
+    duration = time.perf_counter() - scheduler.start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    pygame.quit()
+    return {
+        "scenario": name,
+        "seconds": round(duration, 3),
+        "startup_s": round(scheduler.first_frame - started, 3),
+        "frames": len(frames),
+        "fps": round(len(frames) / duration, 1),
+        "p50_ms": round(percentile(frames, 50), 3),
+        "p90_ms": round(percentile(frames, 90), 3),
+        "p99_ms": round(percentile(frames, 99), 3),
+        "max_ms": round(max(frames, default=0.0), 3),
+        "cpu_s": round(cpu_time() - scheduler.cpu_start, 3),
+        "rss_mb": round(usage.ru_maxrss / 1024.0, 1),
+    }
+
+
+def spawn(name, seconds):
+    """ Run one scenario in a fresh headless process and return its results. """
+    with tempfile.TemporaryDirectory(prefix="snakewm-bench-") as cache:
+        env = dict(os.environ)
+        env.update(
+            {
+                "SDL_VIDEODRIVER": "dummy",
+                "SDL_AUDIODRIVER": "dummy",
+                "GPIOZERO_PIN_FACTORY": "mock",
+                "XDG_CACHE_HOME": cache,
+                "PYTHONPATH": os.path.join(ROOT, "snakewm"),
+            }
+        )
+        env.pop("SNAKEWM_IMPORT_PROFILE", None)
+        proc = subprocess.run(
+            [sys.executable, "-m", "snakewm.bench", "--child", name, "--seconds", str(seconds)],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            timeout=seconds + 120,
+        )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    print(proc.stdout[-3000:])
+    print("ERROR: Scenario " + name + " failed with exit status " + str(proc.returncode))
+    return None
+
+
+def compare(results, baseline, tolerance):
+    """ Print the results next to the baseline. Returns the regressions found. """
+    regressions = []
+    print(
+        "%-10s %6s %6s %8s %8s %8s %8s %7s %7s"
+        % ("scenario", "frames", "fps", "p50 ms", "p90 ms", "p99 ms", "max ms", "cpu s", "rss MB")
+    )
+    for result in results:
+        print(
+            "%-10s %6d %6.1f %8.2f %8.2f %8.2f %8.2f %7.2f %7.1f"
+            % tuple(
+                result[k]
+                for k in ("scenario", "frames", "fps", "p50_ms", "p90_ms", "p99_ms", "max_ms", "cpu_s", "rss_mb")
+            )
+        )
+        base = baseline.get(result["scenario"])
+        if base is None:
+            continue
+        changes = []
+        for metric, slack in METRICS.items():
+            if metric not in base:
+                continue
+            old, new = base[metric], result[metric]
+            change = "%s %+.0f%%" % (metric, 100.0 * (new - old) / old) if old else metric + " new"
+            if new > old * (1 + tolerance) + slack:
+                regressions.append((result["scenario"], metric, old, new))
+                change += " REGRESSED"
+            changes.append(change)
+        print("%-10s vs baseline: %s" % ("", ", ".join(changes)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m snakewm.bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run: " + ", ".join(SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each scenario")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed relative slowdown")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_scenario(args.child, args.seconds)
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario " + repr(name))
+
+    results = []
+    for name in names:
+        print("DEBUG: Running scenario " + name + " for " + str(args.seconds) + " s.", flush=True)
+        result = spawn(name, args.seconds)
+        if result is None:
+            return 2
+        results.append(result)
+
+    baseline = {}
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("DEBUG: No baseline at " + args.baseline + ". Use --save-baseline to store one.")
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update({result["scenario"]: result for result in results})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("DEBUG: Baseline saved to " + args.baseline)
+        return 0
+
+    for scenario, metric, old, new in regressions:
+        print("ERROR: %s %s regressed: %s -> %s" % (scenario, metric, old, new))
+    return 1 if regressions else 0
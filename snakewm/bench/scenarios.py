@@ -0,0 +1,134 @@
+"""
+Scripted input for the benchmark harness.
+
+A scenario is a function taking the run length in seconds and returning a
+list of (time, action) steps, sorted by time. An action is a function
+called with the SnakeWM on the UI thread, when its time (in seconds since
+the first frame) has come. The helpers below build actions that post
+input events or call into the WM.
+"""
+
+import random
+
+import pygame
+
+DIMS = (400, 240)
+
+
+def post(event_type, **attrs):
+    pygame.event.post(pygame.event.Event(event_type, **attrs))
+
+
+def key(k, mod=0, text=""):
+    """ Press and release a key. """
+
+    def action(wm):
+        post(pygame.KEYDOWN, key=k, mod=mod, unicode=text, scancode=0)
+        if text:
+            post(pygame.TEXTINPUT, text=text)
+        post(pygame.KEYUP, key=k, mod=mod, unicode=text, scancode=0)
+
+    return action
+
+
+def motion(x, y):
+    """ Move the pointer to (x, y). """
+
+    def action(wm):
+        post(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0), buttons=(0, 0, 0), touch=False)
+
+    return action
+
+
+def click(x, y, button=1):
+    """ Press and release a mouse button at (x, y). """
+
+    def action(wm):
+        post(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=button, touch=False)
+        post(pygame.MOUSEBUTTONUP, pos=(x, y), button=button, touch=False)
+
+    return action
+
+
+def launch(app):
+    """ Open an app, as the app menu does. """
+
+    def action(wm):
+        wm.loadapp(app)
+
+    return action
+
+
+def typing(start, text, rate=8.0):
+    """ Steps that type 'text' starting at 'start', 'rate' keys a second. """
+    steps = []
+    for i, char in enumerate(text):
+        if char == "\n":
+            action = key(pygame.K_RETURN)
+        else:
+            # Only letters and digits get a key code; a space would open the app menu.
+            code = pygame.key.key_code(char) if char.isalnum() else pygame.K_UNKNOWN
+            action = key(code, text=char)
+        steps.append((start + i / rate, action))
+    return steps
+
+
+def scenario_idle(seconds):
+    """ An empty desktop. Measures the idle frame rate and CPU use. """
+    return [(seconds, None)]
+
+
+def scenario_menu(seconds):
+    """ Open the app menu and wander over it with the pointer. """
+    steps = [(0.5, key(pygame.K_SPACE))]
+    t = 1.0
+    while t < seconds - 0.5:
+        x = 10 + int((t * 80) % 240)
+        y = 10 + int((t * 37) % 200)
+        steps.append((t, motion(x, y)))
+        t += 0.05
+    steps.append((seconds - 0.5, key(pygame.K_SPACE)))
+    steps.append((seconds, None))
+    return steps
+
+
+def scenario_snakeye(seconds):
+    """ The system monitor, with its graphs scrolling. """
+    return [(0.5, launch("apps.system.snakeye")), (seconds, None)]
+
+
+def scenario_snaketerm(seconds):
+    """ Type Python into snaketerm. """
+    steps = [(0.5, launch("apps.tools.snaketerm"))]
+    line = "print(sum(range(100)))\n"
+    t = 1.5
+    while t < seconds:
+        steps.extend(typing(t, line))
+        t += len(line) / 8.0 + 0.5
+    steps = [step for step in steps if step[0] < seconds]
+    steps.append((seconds, None))
+    return steps
+
+
+def scenario_castle(seconds):
+    """ Play castle: move the pointer around and click, like a player. """
+    rng = random.Random(1)
+    steps = [(0.5, launch("apps.games.castle"))]
+    t = 2.0
+    while t < seconds:
+        x, y = rng.randrange(DIMS[0]), rng.randrange(DIMS[1])
+        steps.append((t, motion(x, y)))
+        if rng.random() < 0.2:
+            steps.append((t + 0.01, click(x, y)))
+        t += 0.1
+    steps.append((seconds, None))
+    return steps
+
+
+SCENARIOS = {
+    "idle": scenario_idle,
+    "menu": scenario_menu,
+    "snakeye": scenario_snakeye,
+    "snaketerm": scenario_snaketerm,
+    "castle": scenario_castle,
+}
@@ -0,0 +1,135 @@
+"""
+bench_rowdiff: replay frame sequences through RowDiff and report how many
+bytes go to the Sharp Memory LCD per frame, with and without row diffing.
+
+Usage (from the snakewm directory):
+    python3 -m display.bench_rowdiff                  # built-in scenarios
+    python3 -m display.bench_rowdiff castle.npz ...   # recorded sequences
+
+Recorded sequences are .npz files with a 'frames' array of packed frames
+[frame, row, byte], as written by SharpFramebuffer.save_recording(). To
+record one, run the WM with DISPLAY_BACKEND = 'sharp' (on the beepy, or
+on a desktop with FBDEV set to a plain file), press Ctrl+Shift+R, use it,
+and press Ctrl+Shift+R again: the frames are saved as
+~/.cache/glowfire/rowdiff-<date>-<time>.npz.
+The built-in scenarios draw synthetic stand-ins for typical workloads:
+snakeye graph scrolling, snaketerm typing, and castle sprites moving.
+"""
+
+import random
+import sys
+
+import numpy
+import pygame
+
+from .rowdiff import RowDiff, spi_bytes
+from .sharpfb import to_mono
+
+DIMS = (400, 240)
+BLACK = (0,) * 3
+WHITE = (255,) * 3
+
+
+def pack(surface):
+    """ Threshold and pack a surface the same way SharpFramebuffer does. """
+    return numpy.packbits(to_mono(pygame.surfarray.array3d(surface)), axis=1)
+
+
+def scenario_snakeye(count=120):
+    """ snakeye: two 50x160 graphs scroll down one row per sample. """
+    surf = pygame.Surface(DIMS)
+    surf.fill(WHITE)
+    pygame.draw.rect(surf, BLACK, (10, 10, 134, 231), 1)
+    cpu = pygame.Rect(27, 50, 50, 160)
+    ram = pygame.Rect(79, 50, 50, 160)
+    for i in range(count):
+        for graph, value in ((cpu, random.randint(0, 100)), (ram, 40 + i % 5)):
+            surf.blit(surf, graph.move(0, 1), graph.inflate(0, -1).move(0, -1))
+            pygame.draw.line(surf, WHITE, graph.topleft, (graph.right - 1, graph.top))
+            width = round(value * graph.w / 100)
+            pygame.draw.line(surf, BLACK, graph.topleft, (graph.left + width, graph.top))
+        yield pack(surf)
+
+
+def scenario_snaketerm(count=200):
+    """ snaketerm: one 6x12 glyph per keystroke, newline every 40 keys. """
+    surf = pygame.Surface(DIMS)
+    surf.fill(WHITE)
+    term = pygame.Rect(20, 30, 360, 180)
+    col, line = 0, 0
+    for i in range(count):
+        x = term.left + col * 6
+        y = term.top + line * 12
+        pygame.draw.rect(surf, BLACK, (x + 1, y + 2, 4, 8), 1)
+        col += 1
+        if col == 40:
+            col = 0
+            line += 1
+            if line == term.h // 12:
+                # scroll the terminal up one line
+                line -= 1
+                surf.blit(surf, term.topleft, term.move(0, 12).clip(term))
+                surf.fill(WHITE, (term.left, term.bottom - 12, term.w, 12))
+        yield pack(surf)
+
+
+def scenario_castle(count=120):
+    """ castle: a dozen 12x12 monsters walk across a static level. """
+    random.seed(1)
+    level = pygame.Surface(DIMS)
+    level.fill(WHITE)
+    for x in range(0, DIMS[0], 40):
+        pygame.draw.line(level, BLACK, (x, 0), (x, 184))
+    pygame.draw.rect(level, BLACK, (0, 184, 400, 56))
+    monsters = [[random.randint(0, 400), random.randint(0, 170)] for i in range(12)]
+    surf = pygame.Surface(DIMS)
+    for i in range(count):
+        surf.blit(level, (0, 0))
+        for monster in monsters:
+            monster[0] = (monster[0] + 2) % DIMS[0]
+            pygame.draw.rect(surf, BLACK, (monster[0], monster[1], 12, 12))
+        yield pack(surf)
+
+
+SCENARIOS = {
+    "snakeye": scenario_snakeye,
+    "snaketerm": scenario_snaketerm,
+    "castle": scenario_castle,
+}
+
+
+def bench(name, frames):
+    """ Print bytes per frame for a full refresh vs. row diffing. """
+    frames = list(frames)
+    height, row_bytes = frames[0].shape
+    counts = RowDiff(height, row_bytes).replay(frames)
+
+    full = spi_bytes(height, row_bytes)
+    diffed = [spi_bytes(count, row_bytes) for count in counts]
+    # The first frame is always a full refresh; report steady state.
+    steady = diffed[1:] or diffed
+    mean = sum(steady) / len(steady)
+    print(
+        "%-12s %5d frames  %6.1f rows/frame  full %6d B/frame  diff %8.1f B/frame  (%.1f%%)"
+        % (
+            name,
+            len(frames),
+            sum(counts[1:] or counts) / len(steady),
+            full,
+            mean,
+            100.0 * mean / full,
+        )
+    )
+
+
+def main(paths):
+    if paths:
+        for path in paths:
+            bench(path, numpy.load(path)["frames"])
+    else:
+        for name, scenario in SCENARIOS.items():
+            bench(name, scenario())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
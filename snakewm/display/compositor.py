@@ -0,0 +1,171 @@
+"""
+compositor: damage-tracking screen compositor for snakewm.
+
+Instead of redrawing and pushing all 400x240 pixels every frame, the
+compositor collects the rectangles that changed since the last frame
+(UI elements, paint brush, dynamic backgrounds), redraws only those
+regions, and passes only those rectangles to the display. The mouse
+cursor is a separate plane on top (see cursor.py), so moving it does not
+damage the frame underneath.
+"""
+
+import zlib
+
+import pygame
+
+
+def checksum(surface):
+    """ Cheap content fingerprint of a surface, used to spot in-place redraws. """
+    try:
+        return zlib.crc32(surface.get_buffer())
+    except (pygame.error, ValueError):
+        # Unreadable pixels: return a fresh object so it always counts as changed.
+        return object()
+
+
+def merge_rects(rects):
+    """ Merge overlapping rectangles so no region gets drawn twice. """
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Compositor:
+    """ Redraws and pushes only the damaged regions of the screen. """
+
+    # Past this many rects, or this fraction of the screen area, a single
+    # full-screen update is cheaper than many small ones.
+    MAX_RECTS = 12
+    MAX_COVERAGE = 0.6
+
+    def __init__(self, screen, manager, update=pygame.display.update):
+        """
+        screen - the surface the frame is composited on
+        manager - UIManager whose elements are tracked for damage
+        update - function(rects) that pushes rects of 'screen' to the panel
+        """
+        self.screen = screen
+        self.manager = manager
+        self.update = update
+        self.screen_rect = screen.get_rect()
+
+        # Rectangles damaged since the last present().
+        self.damage = []
+
+        # Sprite -> (rect, layer, id of its image, checksum or None) as of
+        # the last frame.
+        self.sprites = {}
+
+        # CursorPlane drawn over the frame, if any.
+        self.cursor = None
+
+        # Nothing is on the display yet.
+        self.damage_all()
+
+    def set_cursor(self, cursor):
+        """ Draw 'cursor' (a CursorPlane) over every frame. """
+        if self.cursor is not None:
+            self.add_damage(self.cursor.hide() or (0, 0, 0, 0))
+        self.cursor = cursor
+
+    def add_damage(self, rect):
+        """ Mark a screen rectangle as needing a redraw. """
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.w > 0 and rect.h > 0:
+            self.damage.append(rect)
+
+    def damage_all(self):
+        """ Mark the whole screen as needing a redraw. """
+        self.damage = [self.screen_rect.copy()]
+
+    def track_ui(self):
+        """
+        Compare every visible UI sprite against the previous frame, and
+        damage the old and new rects of sprites that moved, restacked,
+        got a new image, changed pixels, appeared or disappeared.
+
+        Only sprites that kept the same image surface are checksummed, to
+        catch drawing into it in place; a new surface is damage already.
+        """
+        current = {}
+        for sprite in self.manager.get_sprite_group().sprites():
+            image = sprite.image
+            if image is None or not sprite.visible:
+                continue
+            rect = pygame.Rect(sprite.rect.topleft, image.get_size())
+            previous = self.sprites.get(sprite)
+
+            if previous is None or previous[:3] != (rect, sprite.layer, id(image)):
+                # Checksummed on the next frame, if the surface stays.
+                current[sprite] = (rect, sprite.layer, id(image), None)
+                if previous is not None:
+                    self.add_damage(previous[0])
+                self.add_damage(rect)
+                continue
+
+            state = (rect, sprite.layer, id(image), checksum(image))
+            current[sprite] = state
+            # No checksum last frame: it may have been drawn into since.
+            if previous[3] is None or previous[3] != state[3]:
+                self.add_damage(rect)
+
+        for sprite, previous in self.sprites.items():
+            if sprite not in current:
+                self.add_damage(previous[0])
+
+        self.sprites = current
+
+    def flush(self):
+        """ Return the merged damage for this frame, and reset it. """
+        rects = merge_rects(self.damage)
+        self.damage = []
+
+        area = sum(rect.w * rect.h for rect in rects)
+        if len(rects) > self.MAX_RECTS or area > self.MAX_COVERAGE * (
+            self.screen_rect.w * self.screen_rect.h
+        ):
+            rects = [self.screen_rect.copy()]
+        return rects
+
+    def present(self, draw):
+        """
+        Redraw and push the damaged regions.
+        draw - function(surface, rect) that paints every layer of the frame;
+               the surface is clipped to rect while it runs.
+        Returns the list of rects pushed to the display (empty when idle).
+        """
+        rects = self.flush()
+        cursor = self.cursor
+        moved = cursor is not None and cursor.moved
+        if not rects and not moved:
+            return rects
+
+        # The cursor comes off before the frame under it is redrawn, and
+        # goes back on after. Untouched, it needs neither.
+        old = new = None
+        if moved or (cursor is not None and cursor.shown is not None
+                     and cursor.shown.collidelist(rects) != -1):
+            old = cursor.hide()
+
+        for rect in rects:
+            self.screen.set_clip(rect)
+            draw(self.screen, rect)
+        self.screen.set_clip(None)
+
+        if cursor is not None and cursor.shown is None:
+            new = cursor.show()
+
+        if moved and rects != [self.screen_rect]:
+            # Only the old and new cursor spots changed outside the damage.
+            rects = merge_rects(rects + [r for r in (old, new) if r is not None])
+            if not rects:
+                return rects
+
+        self.update(rects)
+        return rects
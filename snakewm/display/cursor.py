@@ -0,0 +1,71 @@
+"""
+cursor: a software cursor plane with save-under, for snakewm.
+
+The cursor is not part of the composited frame. The plane keeps a copy
+of the screen pixels under the cursor; to move it, those pixels are put
+back, the pixels under the new position are saved, and the cursor is
+blitted there. A pointer move with nothing else changing costs two
+small blits and pushes two cursor-sized rects, instead of redrawing the
+background and UI under both positions.
+"""
+
+import pygame
+
+
+class CursorPlane:
+    """ The mouse cursor, drawn over the finished frame with save-under. """
+
+    def __init__(self, screen, image, pos=(0, 0)):
+        """
+        screen - the surface the frame is composited on
+        image - cursor image, with per-pixel alpha
+        pos - initial top left of the cursor
+        """
+        self.screen = screen
+        self.image = image
+        self.screen_rect = screen.get_rect()
+
+        # Where the cursor should be, and the part of the screen it covers
+        # right now (clipped to the screen, None when not drawn).
+        self.rect = image.get_rect(topleft=pos)
+        self.shown = None
+        self.shown_at = None
+
+        # Screen pixels under self.shown.
+        self.under = pygame.Surface(image.get_size(), 0, screen)
+
+    def move(self, pos):
+        """ Put the cursor's top left at 'pos'. Drawn by the next present. """
+        self.rect.topleft = pos
+
+    @property
+    def moved(self):
+        """ True if the cursor is not drawn where it should be. """
+        return self.shown_at != self.rect.topleft
+
+    def hide(self):
+        """
+        Restore the pixels under the cursor.
+        Returns the screen rect that changed, or None.
+        """
+        shown = self.shown
+        if shown is not None:
+            self.screen.blit(self.under, shown.topleft, pygame.Rect((0, 0), shown.size))
+            self.shown = None
+            self.shown_at = None
+        return shown
+
+    def show(self):
+        """
+        Save the pixels under the cursor's position and draw it there.
+        Returns the screen rect that changed, or None if it is off screen.
+        """
+        self.hide()
+        self.shown_at = self.rect.topleft
+        clipped = self.rect.clip(self.screen_rect)
+        if clipped.w <= 0 or clipped.h <= 0:
+            return None
+        self.under.blit(self.screen, (0, 0), clipped)
+        self.screen.blit(self.image, self.rect)
+        self.shown = clipped
+        return clipped
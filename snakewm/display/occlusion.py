@@ -0,0 +1,65 @@
+"""
+occlusion: which top-level windows can actually be seen.
+
+Every frame the WM walks the top-level UI elements from the top of the
+stack down, and marks each one whose rect is off the screen, or entirely
+covered by the elements above it, as occluded. Apps read the state from
+an OCCLUDED attribute and skip their render work while it is True; the
+WM also ignores an occluded app's FRAME_RATE.
+"""
+
+import pygame
+
+
+def subtract(rect, cover):
+    """ The parts of 'rect' outside 'cover', as up to four rects. """
+    if not rect.colliderect(cover):
+        return [rect]
+    pieces = []
+    if cover.top > rect.top:
+        pieces.append(pygame.Rect(rect.left, rect.top, rect.width, cover.top - rect.top))
+    if cover.bottom < rect.bottom:
+        pieces.append(pygame.Rect(rect.left, cover.bottom, rect.width, rect.bottom - cover.bottom))
+    top = max(rect.top, cover.top)
+    bottom = min(rect.bottom, cover.bottom)
+    if cover.left > rect.left:
+        pieces.append(pygame.Rect(rect.left, top, cover.left - rect.left, bottom - top))
+    if cover.right < rect.right:
+        pieces.append(pygame.Rect(cover.right, top, rect.right - cover.right, bottom - top))
+    return pieces
+
+
+def covered(rect, covers):
+    """ True if the rects in 'covers' together cover all of 'rect'. """
+    pieces = [rect]
+    for cover in covers:
+        pieces = [piece for old in pieces for piece in subtract(old, cover)]
+        if not pieces:
+            return True
+    return False
+
+
+def update_occlusion(elements, screen_rect):
+    """
+    Set OCCLUDED on each element: True if none of it is on screen and
+    uncovered by the visible elements stacked above it.
+    elements - the top-level UI elements, in any order
+    Returns the elements whose state changed.
+    """
+    # A window's own container is a root element too; it is part of the window.
+    elements = [e for e in elements if getattr(e, "parent_element", None) is None]
+
+    changed = []
+    covers = []
+    for element in sorted(elements, key=lambda e: e.layer, reverse=True):
+        rect = element.rect.clip(screen_rect)
+        occluded = (not element.visible or rect.w <= 0 or rect.h <= 0
+                    or covered(rect, covers))
+        if getattr(element, "OCCLUDED", False) != occluded:
+            element.OCCLUDED = occluded
+            changed.append(element)
+        if element.visible:
+            # The drop shadow around a window is see-through.
+            shadow = getattr(element, "shadow_width", 0) or 0
+            covers.append(rect.clip(element.rect.inflate(-2 * shadow, -2 * shadow)))
+    return changed
@@ -0,0 +1,82 @@
+"""
+rowdiff: row-diff engine for line-addressed Memory LCD refresh.
+
+The Sharp Memory LCD is addressed one scanline at a time: each line sent
+over SPI is an address byte, the line's pixels, and a trailer byte. So the
+cost of a refresh is proportional to the number of lines that changed, not
+to the area that changed. RowDiff keeps the last packed 1-bpp frame and,
+given a new frame (or a band of it), returns the minimal set of scanlines
+that differ. spans() groups those lines into runs for bulk writes.
+
+A packed frame is a numpy uint8 array indexed [row, byte], as produced by
+numpy.packbits(mono, axis=1). For the 400x240 panel that is 240 x 50.
+"""
+
+import numpy
+
+# Sharp Memory LCD multi-line write: 1 mode byte + per line (1 address byte
+# + data + 1 dummy byte) + 1 trailing dummy byte.
+SPI_COMMAND_BYTES = 2
+SPI_LINE_OVERHEAD = 2
+
+
+def spans(rows):
+    """ Group sorted row indices into (start, stop) runs of adjacent rows. """
+    runs = []
+    for row in rows:
+        row = int(row)
+        if runs and runs[-1][1] == row:
+            runs[-1][1] = row + 1
+        else:
+            runs.append([row, row + 1])
+    return [tuple(run) for run in runs]
+
+
+def spi_bytes(line_count, row_bytes):
+    """ Bytes sent over SPI to refresh 'line_count' lines of 'row_bytes' each. """
+    if line_count == 0:
+        return 0
+    return SPI_COMMAND_BYTES + line_count * (row_bytes + SPI_LINE_OVERHEAD)
+
+
+class RowDiff:
+    """ Tracks the frame on the panel and finds the scanlines that changed. """
+
+    def __init__(self, height, row_bytes):
+        self.height = height
+        self.row_bytes = row_bytes
+
+        # Packed copy of what is on the panel.
+        self.frame = numpy.zeros((height, row_bytes), numpy.uint8)
+        # Until the first full frame the panel contents are unknown.
+        self.valid = False
+
+    def invalidate(self):
+        """ Forget the panel contents, so the next diff returns every row. """
+        self.valid = False
+
+    def diff(self, packed, top=0):
+        """
+        Compare rows top..top+len(packed) of the new frame against the panel,
+        remember them, and return the indices of the rows that changed.
+        packed - uint8 array [row, byte] holding the new rows
+        top - screen row of packed[0]
+        """
+        bottom = top + packed.shape[0]
+        if self.valid:
+            changed = numpy.flatnonzero(
+                numpy.any(packed != self.frame[top:bottom], axis=1)
+            )
+        else:
+            changed = numpy.arange(packed.shape[0])
+        self.frame[top:bottom] = packed
+        if top == 0 and bottom == self.height:
+            self.valid = True
+        return changed + top
+
+    def replay(self, frames):
+        """
+        Feed a sequence of full packed frames through the diff and return
+        a list of dirty-row counts, one per frame.
+        """
+        return [len(self.diff(frame)) for frame in frames]
@@ -0,0 +1,248 @@
+"""
+sharpfb: native 1-bit output path for the Sharp Memory LCD.
+
+The Sharp panel can only show black and white, and it is refreshed line by
+line over SPI. Instead of letting SDL convert and push the whole 24/32-bit
+frame, this backend:
+  1. thresholds (or ordered-dithers) the composited frame to 1 bit per pixel
+     with numpy, only for the rows the compositor says were damaged,
+  2. packs those rows into a 1-bpp shadow buffer (400x240 is 12 KB), and
+     finds the scanlines that actually changed with rowdiff.RowDiff,
+  3. writes only those rows to a memory-mapped framebuffer, so the driver
+     only sends those lines to the panel.
+
+The framebuffer can be a plain file, which is how the backend is tested
+off-device (from the snakewm directory):
+    python3 -m display.sharpfb /tmp/fake-fb1
+"""
+
+import mmap
+import os
+
+import pygame
+
+try:
+    import numpy
+    from .rowdiff import RowDiff, spans
+except ImportError:
+    numpy = None
+
+FBDEV = "/dev/fb1"
+
+# Frames kept by start_recording(), about 12 KB each; later ones are dropped.
+RECORD_LIMIT = 3000
+SYSFS_GRAPHICS = "/sys/class/graphics"
+
+# Normalized 4x4 Bayer matrix for ordered dithering. Ordered dithering is
+# used instead of error diffusion so that a change in one row never ripples
+# into the rows below it, which would defeat the line-by-line update.
+BAYER_4X4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+
+
+def read_fb_info(device):
+    """
+    Return (bits_per_pixel, line_length) for a framebuffer device from
+    sysfs, or (None, None) if the device is not a framebuffer (e.g. a file).
+    """
+    name = os.path.basename(device)
+    try:
+        with open(os.path.join(SYSFS_GRAPHICS, name, "bits_per_pixel")) as f:
+            bpp = int(f.read())
+        with open(os.path.join(SYSFS_GRAPHICS, name, "stride")) as f:
+            line_length = int(f.read())
+        return bpp, line_length
+    except (OSError, ValueError):
+        return None, None
+
+
+def to_mono(rgb, threshold=128, dither=False, top=0):
+    """
+    Convert an RGB pixel array indexed [x, y, channel] (as returned by
+    pygame.surfarray) into a boolean array indexed [y, x], True for white.
+    top - screen row of rgb[:, 0], so the dither pattern stays aligned
+    """
+    # Integer Rec. 601 luma, 0-255.
+    luma = (
+        rgb[..., 0].astype(numpy.uint16) * 77
+        + rgb[..., 1].astype(numpy.uint16) * 150
+        + rgb[..., 2].astype(numpy.uint16) * 29
+    ) >> 8
+    luma = luma.T
+
+    if not dither:
+        return luma >= threshold
+
+    height, width = luma.shape
+    bayer = (numpy.array(BAYER_4X4, dtype=numpy.uint16) * 16 + 8)
+    rows = (numpy.arange(top, top + height) % 4)[:, None]
+    cols = (numpy.arange(width) % 4)[None, :]
+    return luma >= bayer[rows, cols]
+
+
+class SharpFramebuffer:
+    """
+    Drop-in replacement for pygame.display.update() that pushes a surface
+    to a memory-mapped framebuffer as 1-bit rows.
+    """
+
+    def __init__(
+        self,
+        surface,
+        device=FBDEV,
+        bpp=None,
+        line_length=None,
+        threshold=128,
+        dither=False,
+        invert=False,
+        bitorder="big",
+    ):
+        """
+        surface - the composited frame to read pixels from
+        device - framebuffer device, or a plain file standing in for one
+        bpp, line_length - framebuffer format; read from sysfs if not given,
+                           and 1 bpp packed if the device is not in sysfs
+        threshold - luma at or above which a pixel is white
+        dither - use 4x4 ordered dithering instead of a flat threshold
+        invert - set if a 1 bit means black on this panel
+        bitorder - order of pixels inside a byte at 1 bpp ("big" or "little")
+        """
+        if numpy is None:
+            raise ImportError("sharpfb needs numpy: python3 -m pip install numpy")
+
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.threshold = threshold
+        self.dither = dither
+        self.invert = invert
+        self.bitorder = bitorder
+
+        sys_bpp, sys_line_length = read_fb_info(device)
+        self.bpp = bpp or sys_bpp or 1
+        self.row_bytes = (self.width * self.bpp + 7) // 8
+        self.line_length = line_length or sys_line_length or self.row_bytes
+
+        # Packed 1-bpp shadow of what is currently on the panel.
+        self.rowdiff = RowDiff(self.height, (self.width + 7) // 8)
+
+        # Packed frames kept while recording, see start_recording().
+        self.recording = None
+
+        # Map the framebuffer. A plain file is grown to size first.
+        size = self.line_length * self.height
+        self.fd = os.open(device, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size < size and not device.startswith("/dev/"):
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
+
+        # Counters for benchmarking.
+        self.rows_written = 0
+        self.bytes_written = 0
+
+    def rows_from_rects(self, rects):
+        """ Collapse a list of rects into sorted, non-overlapping (top, bottom) bands. """
+        if rects is None or not self.rowdiff.valid:
+            return [(0, self.height)]
+        bands = []
+        for rect in sorted(pygame.Rect(r) for r in rects):
+            top = max(0, rect.top)
+            bottom = min(self.height, rect.bottom)
+            if bottom <= top:
+                continue
+            if bands and top <= bands[-1][1]:
+                bands[-1] = (bands[-1][0], max(bands[-1][1], bottom))
+            else:
+                bands.append((top, bottom))
+        return sorted(bands)
+
+    def mono_rows(self, top, bottom):
+        """ Return rows top..bottom of the surface as a [y, x] boolean array. """
+        if self.surface.get_bytesize() >= 3:
+            rgb = pygame.surfarray.pixels3d(self.surface)[:, top:bottom]
+            mono = to_mono(rgb, self.threshold, self.dither, top)
+            del rgb  # unlock the surface
+        else:
+            rgb = pygame.surfarray.array3d(self.surface)[:, top:bottom]
+            mono = to_mono(rgb, self.threshold, self.dither, top)
+        return mono
+
+    def native_rows(self, mono):
+        """ Convert [y, x] boolean rows into framebuffer bytes, one row per line. """
+        white = mono != self.invert
+        if self.bpp == 1:
+            rows = numpy.packbits(white, axis=1, bitorder=self.bitorder)
+        else:
+            dtype = {8: numpy.uint8, 16: numpy.uint16, 32: numpy.uint32}[self.bpp]
+            rows = numpy.where(white, numpy.iinfo(dtype).max, 0).astype(dtype)
+            rows = rows.view(numpy.uint8)
+        if self.line_length > self.row_bytes:
+            padded = numpy.zeros((rows.shape[0], self.line_length), numpy.uint8)
+            padded[:, : rows.shape[1]] = rows
+            rows = padded
+        return rows
+
+    def update(self, rects=None):
+        """
+        Push the damaged rows of the surface to the framebuffer.
+        rects - damaged screen rects, as passed to pygame.display.update();
+                None means the whole screen
+        Returns the list of screen rows that were written.
+        """
+        written = []
+        for top, bottom in self.rows_from_rects(rects):
+            mono = self.mono_rows(top, bottom)
+            changed = self.rowdiff.diff(numpy.packbits(mono, axis=1), top)
+            if changed.size == 0:
+                continue
+            self.write_rows(changed, self.native_rows(mono[changed - top]))
+            written.extend(int(y) for y in changed)
+
+        if self.recording is not None and len(self.recording) < RECORD_LIMIT:
+            self.recording.append(self.rowdiff.frame.copy())
+        return written
+
+    def write_rows(self, rows, native):
+        """ Write native row data into the mapped framebuffer, in runs of adjacent rows. """
+        index = 0
+        for start, stop in spans(rows):
+            count = stop - start
+            data = native[index : index + count].tobytes()
+            offset = start * self.line_length
+            self.map[offset : offset + len(data)] = data
+            self.rows_written += count
+            self.bytes_written += len(data)
+            index += count
+
+    def start_recording(self):
+        """ Keep a copy of every packed frame pushed, for bench_rowdiff.py. """
+        self.recording = []
+
+    def save_recording(self, path):
+        """ Save the recorded frames as a compressed .npz, and stop recording. """
+        numpy.savez_compressed(path, frames=numpy.array(self.recording))
+        self.recording = None
+
+    def close(self):
+        """ Unmap and close the framebuffer. """
+        self.map.close()
+        os.close(self.fd)
+
+
+# Test the module against a plain file standing in for /dev/fb1
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/sharpfb-test"
+    surf = pygame.Surface((400, 240))
+    surf.fill((255, 255, 255))
+    fb = SharpFramebuffer(surf, device=path)
+    print("first frame rows:", len(fb.update()))
+    print("unchanged frame rows:", len(fb.update()))
+    pygame.draw.line(surf, (0, 0, 0), (10, 100), (390, 104))
+    print("line rows:", fb.update([pygame.Rect(10, 100, 381, 5)]))
+    print("bytes written:", fb.bytes_written)
+    fb.close()
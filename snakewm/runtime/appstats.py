@@ -0,0 +1,105 @@
+"""
+appstats: which app the WM's threads and memory belong to.
+
+Every app runs inside the WM's process, so system monitors only ever
+show one busy python. This module keeps what is needed to split that up
+by app:
+
+    threads  install() wraps threading.Thread.start. A thread started
+             from an app's code (its load(), an event handler, a worker
+             it runs) is recorded as that app's, by native thread id.
+    memory   AppPreloader calls note_load() with the resident memory
+             an app's import and preload() added, assets included, and
+             SnakeWM.start_app() with what its load() added. An app's
+             memory is the sum. Both are measured for the whole process
+             around the work, so they are estimates.
+
+Snakeye's process view reads both. The WM's own threads, and threads
+started by libraries outside any app, belong to WM.
+"""
+
+import os
+import re
+import sys
+import threading
+
+WM = "wm"
+
+# App module names look like "apps.system.snakeye", or with a "snakewm."
+# prefix when the WM runs as a package.
+APP_MODULE = re.compile(r"^(?:snakewm\.)?(apps\.[^.]+\.[^.]+)")
+
+PROC_SELF_STATM = "/proc/self/statm"
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+# Native thread id -> app that started the thread.
+THREAD_APPS = {}
+# App -> kB of resident memory its preload added, its last start added,
+# and the sum of the two.
+PRELOAD_RSS = {}
+START_RSS = {}
+LOAD_RSS = {}
+
+_installed = False
+
+
+def app_name(module):
+    """ "apps.sound.voicebox" for any module inside that app, else None. """
+    match = APP_MODULE.match(module or "")
+    return match.group(1) if match else None
+
+
+def caller_app(frame):
+    """ The innermost app on the call stack starting at 'frame', or None. """
+    while frame is not None:
+        app = app_name(frame.f_globals.get("__name__"))
+        if app is not None:
+            return app
+        frame = frame.f_back
+    return None
+
+
+def install():
+    """ Record the app starting each new thread from now on. """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    start = threading.Thread.start
+
+    def start_and_record(thread):
+        app = caller_app(sys._getframe(1))
+        start(thread)
+        if app is not None and thread.native_id is not None:
+            THREAD_APPS[thread.native_id] = app
+
+    threading.Thread.start = start_and_record
+
+
+def thread_app(native_id):
+    """ The app a thread belongs to: the one that started it, or WM. """
+    return THREAD_APPS.get(native_id, WM)
+
+
+def rss_kb():
+    """ Resident memory of the WM process in kB, or 0 where it cannot be read. """
+    try:
+        with open(PROC_SELF_STATM, "rb") as f:
+            return int(f.read().split()[1]) * PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def note_load(app, kb, preload=False):
+    """
+    Record that starting 'app', or preloading it if 'preload' is set,
+    grew resident memory by 'kb' kB.
+    """
+    app = app_name(app) or app
+    (PRELOAD_RSS if preload else START_RSS)[app] = max(0, kb)
+    LOAD_RSS[app] = PRELOAD_RSS.get(app, 0) + START_RSS.get(app, 0)
+
+
+def forget_thread(native_id):
+    """ Drop a thread that has exited. """
+    THREAD_APPS.pop(native_id, None)
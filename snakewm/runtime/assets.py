@@ -0,0 +1,91 @@
+"""
+assets: shared cache of decoded images and sounds.
+
+Apps load their assets with load_image() and load_sound() instead of
+pygame.image.load() and pygame.mixer.Sound(). Each file is decoded once:
+the app preloader can decode an app's assets on its worker thread before
+the app is opened, and reopening an app reuses what is already decoded.
+
+Cached surfaces and sounds are shared between app instances, so apps
+must copy a surface before drawing on it, and must not call set_volume()
+or stop() on a sound: set the volume on, and stop, the Channel that
+Sound.play() returns instead.
+"""
+
+import collections
+import threading
+
+import pygame
+
+# Least recently used assets are dropped past this many bytes.
+MAX_BYTES = 48 * 1024 * 1024
+
+_cache = collections.OrderedDict()  # key -> (asset, size in bytes)
+_bytes = 0
+_lock = threading.Lock()
+
+
+def _get(key):
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        _cache.move_to_end(key)
+        return entry[0]
+
+
+def _put(key, asset, size):
+    global _bytes
+    with _lock:
+        if key in _cache:
+            # Another thread decoded it first. Keep that one.
+            _cache.move_to_end(key)
+            return _cache[key][0]
+        _cache[key] = (asset, size)
+        _bytes += size
+        while _bytes > MAX_BYTES and len(_cache) > 1:
+            _, (_, dropped) = _cache.popitem(last=False)
+            _bytes -= dropped
+    return asset
+
+
+def load_image(path, size=None):
+    """
+    Return the image at 'path' as a Surface, scaled to 'size' if given.
+    The surface is not converted, so this is safe on any thread.
+    """
+    key = ("image", path, size)
+    image = _get(key)
+    if image is None:
+        image = pygame.image.load(path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        image = _put(key, image, image.get_bytesize() * image.get_width() * image.get_height())
+    return image
+
+
+def load_sound(path):
+    """ Return the sound at 'path' as a pygame.mixer.Sound. """
+    key = ("sound", path)
+    sound = _get(key)
+    if sound is None:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        sound = pygame.mixer.Sound(path)
+        frequency, format, channels = pygame.mixer.get_init()
+        size = int(sound.get_length() * frequency) * channels * (abs(format) // 8)
+        sound = _put(key, sound, size)
+    return sound
+
+
+def cached_bytes():
+    """ Bytes of decoded assets currently held by the cache. """
+    return _bytes
+
+
+def clear():
+    """ Drop every cached asset. """
+    global _bytes
+    with _lock:
+        _cache.clear()
+        _bytes = 0
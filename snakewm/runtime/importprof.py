@@ -0,0 +1,176 @@
+"""
+importprof: startup import profiler, a structured `python3 -X importtime`.
+
+Set SNAKEWM_IMPORT_PROFILE to a log path to profile a WM start:
+    SNAKEWM_IMPORT_PROFILE=/tmp/snakewm-imports.jsonl python3 snakewm/wm.py
+
+Every module imported until the first frame is drawn is written to the log
+as one JSON object per line, in the order the imports finished:
+    {"module": "numpy", "parent": "display.sharpfb", "depth": 1,
+     "start_ms": 412.3, "self_us": 699, "cumulative_us": 30519}
+self_us is the time spent in the module's own code; cumulative_us also
+includes the modules it imported. Milestones such as the first frame are
+logged as {"event": "first_frame", "t_ms": ...}, with times in ms since
+the profiler was installed. A summary of the slowest imports is printed.
+"""
+
+import json
+import sys
+import time
+
+# Environment variable holding the log path.
+ENV_VAR = "SNAKEWM_IMPORT_PROFILE"
+
+
+class ImportProfiler:
+    """
+    A sys.meta_path finder that times the loading of every module it sees
+    found, by wrapping the create_module/exec_module methods of its loader.
+    """
+
+    # Modules listed in the printed summary.
+    SUMMARY_COUNT = 15
+
+    def __init__(self, path):
+        self.path = path
+        self.start = time.perf_counter()
+        # Finished imports and milestones, as dicts, in order.
+        self.records = []
+        # [name, start, child time] for loader calls still running.
+        self.stack = []
+        # Module name -> times so far, for modules not fully loaded yet.
+        self.pending = {}
+        # Guards against the finder recursing into itself.
+        self.finding = set()
+
+    def now_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def install(self):
+        """ Start timing imports. """
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """ Stop timing imports. Modules being loaded still get recorded. """
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        """ Find the module with the other finders, and time its loader. """
+        if name in self.finding:
+            return None
+        self.finding.add(name)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self.finding.discard(name)
+
+        loader = spec.loader
+        # Built-in and frozen modules are loaded by shared classes, which
+        # cannot be patched per module. They are cheap, so they are skipped.
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        self.wrap(loader)
+        return spec
+
+    def wrap(self, loader):
+        """ Time create_module() and exec_module() on this loader instance. """
+        if getattr(loader, "importprof_wrapped", False):
+            # A loader shared by several modules is only wrapped once.
+            return
+        create_module = getattr(loader, "create_module", None)
+        exec_module = loader.exec_module
+        if create_module is None:
+            return
+
+        def timed_create(spec):
+            self.enter(spec.name)
+            try:
+                return create_module(spec)
+            finally:
+                self.leave(done=False)
+
+        def timed_exec(module):
+            self.enter(module.__name__)
+            try:
+                exec_module(module)
+            finally:
+                self.leave(done=True)
+
+        try:
+            loader.create_module = timed_create
+            loader.exec_module = timed_exec
+            loader.importprof_wrapped = True
+        except AttributeError:
+            # Loaders with __slots__ cannot be patched.
+            pass
+
+    def enter(self, name):
+        """ Start timing a create_module() or exec_module() call. """
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self, done):
+        """
+        Stop timing the innermost call, and add it to its module's totals.
+        create_module() and exec_module() are timed separately, because a
+        lazy loader runs exec_module() long after create_module().
+        done - True once the module is fully loaded, to record it
+        """
+        name, started, children = self.stack.pop()
+        elapsed = time.perf_counter() - started
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+        totals = self.pending.setdefault(name, {"start": started, "self": 0.0, "cumulative": 0.0})
+        totals["self"] += elapsed - children
+        totals["cumulative"] += elapsed
+        if not done:
+            return
+        del self.pending[name]
+        self.records.append(
+            {
+                "module": name,
+                "parent": self.stack[-1][0] if self.stack else None,
+                "depth": len(self.stack),
+                "start_ms": round((totals["start"] - self.start) * 1000, 3),
+                "self_us": round(totals["self"] * 1e6),
+                "cumulative_us": round(totals["cumulative"] * 1e6),
+            }
+        )
+
+    def mark(self, event):
+        """ Log a startup milestone, e.g. "first_frame". """
+        self.records.append({"event": event, "t_ms": round(self.now_ms(), 3)})
+
+    def report(self):
+        """ Stop profiling, write the log and print the slowest imports. """
+        self.uninstall()
+        try:
+            with open(self.path, "w") as f:
+                for record in self.records:
+                    f.write(json.dumps(record) + "\n")
+            print("DEBUG: Import profile written to " + self.path)
+        except OSError as e:
+            print("ERROR: Could not write import profile: " + str(e))
+
+        modules = [r for r in self.records if "module" in r]
+        print(
+            "DEBUG: %d modules imported, %.1f ms at top level."
+            % (len(modules), sum(r["cumulative_us"] for r in modules if r["depth"] == 0) / 1000)
+        )
+        for record in sorted(modules, key=lambda r: -r["cumulative_us"])[: self.SUMMARY_COUNT]:
+            print(
+                "DEBUG: %8.1f ms cumulative %8.1f ms self  %s"
+                % (record["cumulative_us"] / 1000, record["self_us"] / 1000, record["module"])
+            )
+        for record in self.records:
+            if "event" in record:
+                print("DEBUG: %s at %.1f ms" % (record["event"], record["t_ms"]))
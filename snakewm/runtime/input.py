@@ -0,0 +1,103 @@
+"""
+input: hardware input posted into pygame's event queue.
+
+Hardware that is not an SDL input device, like the beepy's side button on
+GPIO 17, reports presses from its own thread (gpiozero runs callbacks on
+a pin-watching thread). Those callbacks post custom pygame events, which is
+thread-safe, so the main loop handles them like any other input and can
+sleep in pygame.event.wait() while nothing happens.
+
+On desktops the side button is a gpiozero mock pin, driven by the tilde
+key, so the same events and code paths run without a beepy.
+
+coalesce_motion() batches the input of a frame: the beepy's optical
+trackpad reports far more motion events than the WM draws frames, and
+only the last position of a run of moves matters.
+"""
+
+import pygame
+
+# Posted when the side button is pressed and released.
+SIDEBUTTON_DOWN = pygame.event.custom_type()
+SIDEBUTTON_UP = pygame.event.custom_type()
+
+# All custom input events, for the frame scheduler.
+INPUT_EVENTS = (SIDEBUTTON_DOWN, SIDEBUTTON_UP)
+
+SIDEBUTTON_PIN = 17  # GPIO 17 -> GND
+
+# Key that stands in for the side button on desktops.
+MOCK_KEY = pygame.K_BACKQUOTE
+
+
+def post_event(event_type, **attrs):
+    """
+    Post a pygame event. Safe to call from any thread.
+    Returns False if the event was dropped because pygame was shut down.
+    """
+    try:
+        pygame.event.post(pygame.event.Event(event_type, **attrs))
+        return True
+    except pygame.error:
+        return False
+
+
+def coalesce_motion(events):
+    """
+    Collapse each run of consecutive MOUSEMOTION events into one event,
+    with the latest position and buttons and the summed relative motion.
+    Other events, and their order, are kept.
+    """
+    batched = []
+    last = None  # the motion event ending 'batched', if any
+    for event in events:
+        if event.type != pygame.MOUSEMOTION:
+            batched.append(event)
+            last = None
+        elif last is None:
+            batched.append(event)
+            last = event
+        else:
+            attrs = dict(event.dict)
+            attrs["rel"] = (last.rel[0] + event.rel[0], last.rel[1] + event.rel[1])
+            last = pygame.event.Event(pygame.MOUSEMOTION, **attrs)
+            batched[-1] = last
+    return batched
+
+
+class SideButton:
+    """ The beepy side button, posting SIDEBUTTON_DOWN/UP events. """
+
+    def __init__(self, pin=SIDEBUTTON_PIN, mock=False):
+        """
+        pin - GPIO pin the button pulls to ground
+        mock - use a gpiozero mock pin, driven by press() and release()
+        Raises ImportError if gpiozero is not installed.
+        """
+        import gpiozero
+
+        self.mock_pin = None
+        if mock:
+            from gpiozero.pins.mock import MockFactory
+
+            if not isinstance(gpiozero.Device.pin_factory, MockFactory):
+                gpiozero.Device.pin_factory = MockFactory()
+            self.mock_pin = gpiozero.Device.pin_factory.pin(pin)
+
+        self.button = gpiozero.Button(pin)
+        # Called on gpiozero's pin thread.
+        self.button.when_pressed = lambda: post_event(SIDEBUTTON_DOWN)
+        self.button.when_released = lambda: post_event(SIDEBUTTON_UP)
+
+    def press(self):
+        """ Press the mock button. """
+        if self.mock_pin is not None:
+            self.mock_pin.drive_low()
+
+    def release(self):
+        """ Release the mock button. """
+        if self.mock_pin is not None:
+            self.mock_pin.drive_high()
+
+    def close(self):
+        self.button.close()
@@ -0,0 +1,45 @@
+"""
+lazyimport: defer loading a module until one of its attributes is used.
+
+lazy_import() finds the module right away, so a missing module still fails
+at startup, but runs its code only on first attribute access. The WM uses
+it for modules that are not needed to draw the first frame: the app menu,
+the snapper, the dynamic backgrounds, and the Sharp framebuffer backend
+(which pulls in numpy).
+
+    appmenupanel = lazy_import("appmenu.appmenupanel")
+    ...
+    appmenupanel.AppMenuPanel(...)  # the module is loaded here
+"""
+
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Return module 'name', loading it on first attribute access.
+    Raises ImportError if the module cannot be found.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError("No module named " + repr(name), name=name)
+    if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+        # Namespace packages and old-style loaders cannot be deferred.
+        return importlib.import_module(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Bind the submodule on its package, as a normal import would.
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -0,0 +1,116 @@
+"""
+lifecycle: suspend/resume protocol for snakewm apps.
+
+Each top-level window is in one of three states:
+
+    ACTIVE      it can be seen and has focus (panels, which never take
+                focus, are active whenever they can be seen)
+    BACKGROUND  it can be seen, but another window has focus
+    SUSPENDED   it is covered or off screen (OCCLUDED, see occlusion.py)
+
+Apps opt in with any of these, all optional:
+
+    FRAME_RATE             frames a second wanted while active
+    BACKGROUND_FRAME_RATE  most update() calls a second the app gets while
+                           not active; 0 stops its updates altogether
+    on_suspend()           called when the app stops being active: stop
+                           audio polling, animation, /proc sampling
+    on_resume()            called when the app is active again
+
+The WM enforces BACKGROUND_FRAME_RATE: it skips update() calls over the
+budget, and passes the time since the last real update as the delta.
+"""
+
+import time
+
+from .scheduler import requested_rate
+
+ACTIVE = "active"
+BACKGROUND = "background"
+SUSPENDED = "suspended"
+
+
+def can_focus(element):
+    """ True for windows. Panels never take focus. """
+    return hasattr(element, "on_moved_to_front")
+
+
+def app_rate(element):
+    """ Frame rate an app asks for in its current state. 0 means static. """
+    state = getattr(element, "LIFECYCLE", ACTIVE)
+    if state == SUSPENDED or getattr(element, "OCCLUDED", False):
+        return 0
+    rate = requested_rate(element)
+    background_rate = getattr(element, "BACKGROUND_FRAME_RATE", None)
+    if state == BACKGROUND and background_rate is not None:
+        rate = min(rate, background_rate)
+    return rate
+
+
+class AppLifecycle:
+    """ Tracks the state of each top-level window, and calls its hooks. """
+
+    def __init__(self):
+        # Throttled elements -> [their update(), delta not yet passed on,
+        # time.monotonic() of the last call let through].
+        self.budgets = {}
+
+    def refresh(self, elements, focus):
+        """
+        Work out the state of every element, and call on_suspend() and
+        on_resume() on those whose state changed.
+        elements - the top-level UI elements; OCCLUDED must be up to date
+        focus - the focused window, or None
+        """
+        for element in elements:
+            if getattr(element, "parent_element", None) is not None:
+                continue
+            if getattr(element, "OCCLUDED", False):
+                state = SUSPENDED
+            elif element is focus or not can_focus(element):
+                state = ACTIVE
+            else:
+                state = BACKGROUND
+
+            old_state = getattr(element, "LIFECYCLE", ACTIVE)
+            if state != old_state:
+                element.LIFECYCLE = state
+                if old_state == ACTIVE:
+                    self.call(element, "on_suspend")
+                elif state == ACTIVE:
+                    self.call(element, "on_resume")
+
+            if getattr(element, "BACKGROUND_FRAME_RATE", None) is not None:
+                self.throttle(element)
+
+        # Forget windows that were closed.
+        for element in [e for e in self.budgets if not e.alive()]:
+            del self.budgets[element]
+
+    def call(self, element, hook):
+        func = getattr(element, hook, None)
+        if func is None:
+            return
+        try:
+            func()
+        except Exception as e:
+            print("ERROR: " + type(element).__name__ + "." + hook + "() failed: " + repr(e))
+
+    def throttle(self, element):
+        """ Hold the element's update() to its background budget. """
+        if element in self.budgets:
+            return
+        budget = [element.update, 0.0, time.monotonic()]
+        self.budgets[element] = budget
+
+        def throttled_update(delta, *args, **kwargs):
+            budget[1] += delta
+            if getattr(element, "LIFECYCLE", ACTIVE) != ACTIVE:
+                rate = element.BACKGROUND_FRAME_RATE
+                if rate <= 0 or time.monotonic() - budget[2] < 1.0 / rate:
+                    return None
+            delta, budget[1] = budget[1], 0.0
+            budget[2] = time.monotonic()
+            return budget[0](delta, *args, **kwargs)
+
+        element.update = throttled_update
@@ -0,0 +1,213 @@
+"""
+metrics: system readings for the snapper and apps, taken off the UI thread.
+
+The snapper's status bars ask for their value on every UI update. Reading
+the battery used to fork 'cat' (or 'pmset' on macOS) each time, on the
+render thread. MetricsService does the reading on a worker thread at its
+own rate instead and keeps the last value of each reading; the bars only
+look that value up, which never blocks.
+
+Files under /sys and /proc are opened once and re-read in place with
+os.pread(), so a poll is one system call per reading. Wi-Fi signal comes
+from /proc/net/wireless, which the kernel keeps up to date; nothing here
+ever scans for networks.
+
+    from runtime.metrics import shared_metrics
+    battery = shared_metrics().get("battery", 0)
+    wifi = shared_metrics().get("wifi", 0)
+"""
+
+import os
+import platform
+import re
+import subprocess
+import threading
+import time
+
+# Seconds between polls. Battery charge changes over minutes.
+INTERVAL = 5.0
+
+BEEPY_BATTERY = "/sys/firmware/beepy/battery_percent"
+PROC_NET_WIRELESS = "/proc/net/wireless"
+
+# Link quality that counts as a full signal. Most drivers report out of 70.
+WIFI_MAX_QUALITY = 70
+
+# Weight of a new Wi-Fi reading in the smoothed value.
+WIFI_SMOOTHING = 0.3
+
+
+class SysfsReader:
+    """ An integer read from a sysfs or procfs file, kept open between reads. """
+
+    # Most bytes read from the file.
+    SIZE = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __call__(self):
+        """ The file's value, or None if it cannot be read. """
+        try:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_RDONLY)
+            text = os.pread(self.fd, self.SIZE, 0)
+        except OSError:
+            # Reopen next time: the driver may have been reloaded.
+            self.close()
+            return None
+        try:
+            return self.parse(text.decode(errors='replace'))
+        except ValueError:
+            return None
+
+    def parse(self, text):
+        return int(text)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class WirelessReader(SysfsReader):
+    """
+    Wi-Fi signal quality in percent, from /proc/net/wireless, smoothed
+    over the last few reads. 0 when no wireless interface is up.
+
+    path - the file to read; tests can point it at a fixture file
+    """
+
+    SIZE = 4096
+
+    def __init__(self, path=PROC_NET_WIRELESS):
+        super().__init__(path)
+        self.quality = None
+
+    def parse(self, text):
+        # Two header lines, then one line per interface:
+        #  wlan0: 0000   54.  -56.  -256        0      0      0 ...
+        best = None
+        for line in text.splitlines()[2:]:
+            if ":" not in line:
+                continue
+            fields = line.split(":", 1)[1].split()
+            if len(fields) < 2:
+                continue
+            link = float(fields[1].rstrip("."))
+            best = link if best is None else max(best, link)
+
+        if best is None:
+            # Not connected: drop to 0 straight away.
+            self.quality = 0.0
+        else:
+            percent = min(100.0, max(0.0, best * 100.0 / WIFI_MAX_QUALITY))
+            if self.quality is None:
+                self.quality = percent
+            else:
+                self.quality += WIFI_SMOOTHING * (percent - self.quality)
+        return int(round(self.quality))
+
+
+def pmset_battery():
+    """ Battery percent on macOS. Forks pmset, so only call it off the UI thread. """
+    try:
+        output = subprocess.run(['pmset', '-g', 'batt'], capture_output=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    matches = re.findall(r'([0-9]{1,3})%;', output.stdout.decode(errors='replace'))
+    return int(matches[-1]) if matches else None
+
+
+class MetricsService:
+    """ Polls registered readings on a worker thread and caches their values. """
+
+    def __init__(self, interval=INTERVAL):
+        """
+        interval - seconds between polls
+        """
+        self.interval = interval
+        # Name -> function taking no arguments and returning the value, or
+        # None when there is no reading (the value is then left as it was).
+        self.readers = {}
+        self.values = {}
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def add(self, name, reader):
+        """ Poll 'reader' for the value of 'name' from now on. """
+        with self.cond:
+            self.readers[name] = reader
+            self.cond.notify()
+
+    def get(self, name, default=None):
+        """ The last value read for 'name'. Never blocks. """
+        return self.values.get(name, default)
+
+    def start(self):
+        """ Start polling. The first poll runs right away. """
+        with self.cond:
+            self.stopped = False
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.work, name="metrics", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        """ Stop polling and close the readers' files. """
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        for reader in self.readers.values():
+            close = getattr(reader, "close", None)
+            if close is not None:
+                close()
+
+    def poll(self):
+        """ Read every reading once. """
+        with self.cond:
+            readers = list(self.readers.items())
+        for name, reader in readers:
+            try:
+                value = reader()
+            except Exception as e:
+                print("ERROR: Metrics reading " + name + " failed: " + repr(e))
+                value = None
+            if value is not None:
+                self.values[name] = value
+
+    def work(self):
+        """ Worker thread: poll every 'interval' seconds until stopped. """
+        while True:
+            started = time.monotonic()
+            self.poll()
+            with self.cond:
+                if self.stopped:
+                    return
+                self.cond.wait(max(0.0, self.interval - (time.monotonic() - started)))
+                if self.stopped:
+                    return
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_metrics():
+    """ The metrics service every snapper shares, started on first use. """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MetricsService()
+            system = platform.system()
+            if system == 'Linux':
+                _shared.add("battery", SysfsReader(BEEPY_BATTERY))
+                _shared.add("wifi", WirelessReader())
+            elif system == 'Darwin':
+                _shared.add("battery", pmset_battery)
+            _shared.start()
+        return _shared
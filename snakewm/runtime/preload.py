@@ -0,0 +1,163 @@
+"""
+preload: background preloading of app modules and assets.
+
+Opening an app used to import its module and decode its assets (Dance's
+180 frames, Piano's and MIDI's samples) on the UI thread, freezing the WM.
+AppPreloader does that work on a worker thread for the apps the user is
+likely to open next: the recently used ones, and the menu item under the
+pointer. Opening a preloaded app is then a cache hit.
+
+The worker imports the app package and, if the package defines one, calls
+its preload() function, which should decode the app's assets through
+runtime.assets so the app finds them in the cache. App instances are still
+created on the UI thread, by SnakeWM, once APP_READY is posted.
+"""
+
+import collections
+import importlib
+import json
+import os
+import threading
+
+import pygame
+
+# Shared with the WM and snakeye, which import it as runtime.appstats.
+from runtime import appstats
+
+# Posted when an app requested with request() is imported and preloaded.
+# event.app is the module name, event.error the exception if it failed.
+APP_READY = pygame.event.custom_type()
+
+# States of a requested app.
+QUEUED = "queued"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class AppPreloader:
+    """ Imports and preloads apps on a worker thread, most urgent first. """
+
+    # Recently used apps remembered, and preloaded at startup.
+    RECENT_COUNT = 8
+    PRELOAD_RECENT = 3
+
+    def __init__(self, recent_path=None):
+        """
+        recent_path - JSON file the recently used apps are kept in,
+                      or None to not remember them between runs
+        """
+        self.recent_path = recent_path
+        self.recent = self.load_recent()
+
+        # App module name -> state, and -> exception for failed apps.
+        self.states = {}
+        self.errors = {}
+
+        self.queue = collections.deque()
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def load_recent(self):
+        """ Read the recently used apps, most recent first. """
+        if self.recent_path is None:
+            return []
+        try:
+            with open(self.recent_path, "r", encoding="utf-8") as f:
+                recent = json.load(f)
+            return [app for app in recent if isinstance(app, str)][: self.RECENT_COUNT]
+        except (OSError, ValueError):
+            return []
+
+    def save_recent(self):
+        if self.recent_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.recent_path), exist_ok=True)
+            tmp_path = self.recent_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.recent, f)
+            os.replace(tmp_path, self.recent_path)
+        except OSError as e:
+            print("ERROR: Could not save recent apps: " + str(e))
+
+    def start(self):
+        """ Queue the most recently used apps. """
+        for app in self.recent[: self.PRELOAD_RECENT]:
+            self.request(app)
+
+    def request(self, app, urgent=False):
+        """
+        Queue 'app' (a module name like "apps.image.dance") for preloading.
+        urgent - put it at the front of the queue, e.g. for hovered items
+        """
+        with self.cond:
+            state = self.states.get(app)
+            if state in (LOADING, READY, FAILED):
+                return
+            if state == QUEUED:
+                if not urgent:
+                    return
+                self.queue.remove(app)
+            self.states[app] = QUEUED
+            if urgent:
+                self.queue.appendleft(app)
+            else:
+                self.queue.append(app)
+            self.cond.notify()
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name="preload", daemon=True)
+            self.thread.start()
+
+    def is_ready(self, app):
+        return self.states.get(app) == READY
+
+    def error(self, app):
+        """ The exception raised while preloading 'app', or None. """
+        return self.errors.get(app)
+
+    def used(self, app):
+        """ Note that 'app' was opened, for the recently used list. """
+        if app in self.recent:
+            self.recent.remove(app)
+        self.recent.insert(0, app)
+        del self.recent[self.RECENT_COUNT :]
+        self.save_recent()
+
+    def forget(self, app):
+        """ Drop the state of 'app', so it is preloaded again next time. """
+        with self.cond:
+            self.states.pop(app, None)
+            self.errors.pop(app, None)
+
+    def work(self):
+        """ Worker thread: preload queued apps, one at a time. """
+        while True:
+            with self.cond:
+                while not self.queue:
+                    self.cond.wait()
+                app = self.queue.popleft()
+                self.states[app] = LOADING
+
+            error = None
+            rss = appstats.rss_kb()
+            try:
+                module = importlib.import_module(app)
+                preload = getattr(module, "preload", None)
+                if preload is not None:
+                    preload()
+                appstats.note_load(app, appstats.rss_kb() - rss, preload=True)
+            except Exception as e:
+                print("ERROR: Could not preload " + app + ": " + repr(e))
+                error = e
+
+            with self.cond:
+                self.states[app] = READY if error is None else FAILED
+                if error is not None:
+                    self.errors[app] = error
+            try:
+                pygame.event.post(pygame.event.Event(APP_READY, app=app, error=error))
+            except pygame.error:
+                # The display was shut down.
+                return
@@ -0,0 +1,284 @@
+"""
+profiler: frame-time profiler for snakewm.
+
+Times the parts of each frame (event handling, UI update, every top-level
+window's update(), background drawing, draw_ui, and the display update),
+shows a rolling breakdown as an overlay, and dumps the recorded frames to
+a JSON or CSV trace file. Toggle it with Ctrl+Shift+F in the WM, and dump
+a trace with Ctrl+Shift+T.
+
+While disabled, section() and timed() cost one attribute check.
+"""
+
+import collections
+import contextlib
+import csv
+import json
+import time
+
+import pygame
+
+# Sections, in frame order. Window updates are nested inside "update".
+SECTIONS = ("events", "update", "bg", "draw_ui", "display")
+
+
+class FrameProfiler:
+    """ Per-frame section timings, a rolling overlay, and trace dumps. """
+
+    # Frames averaged in the overlay, and kept for trace dumps.
+    OVERLAY_FRAMES = 60
+    TRACE_FRAMES = 3000
+    # Seconds between overlay redraws.
+    OVERLAY_INTERVAL = 0.5
+
+    FONT_SIZE = 12
+    LINE_HEIGHT = 12
+    PADDING = 3
+
+    BLACK = ((0,) * 3)
+    WHITE = ((255,) * 3)
+
+    def __init__(self, screen_rect, font_path=None):
+        """
+        screen_rect - rect of the screen, the overlay sits in its top right
+        font_path - TTF font for the overlay, or None for pygame's default
+        """
+        self.screen_rect = screen_rect
+        self.font_path = font_path
+        self.font = None
+
+        self.enabled = False
+        self.start = time.perf_counter()
+
+        # Finished frames: {"t", "frame", "interval", sections..., "windows"}.
+        self.frames = collections.deque(maxlen=self.TRACE_FRAMES)
+        # The frame being timed.
+        self.current = None
+        self.frame_start = None
+        self.last_frame_start = None
+
+        # Windows whose update() is wrapped -> (their own update, the
+        # wrapper, whether the update was set on the instance).
+        self.wrapped = {}
+
+        # Rendered overlay, its screen rect, and when it was last drawn.
+        self.overlay = None
+        self.overlay_rect = pygame.Rect(0, 0, 0, 0)
+        self.overlay_time = 0.0
+
+    def toggle(self):
+        """
+        Turn profiling and the overlay on or off.
+        Returns the screen rect that needs a redraw.
+        """
+        self.enabled = not self.enabled
+        rect = self.overlay_rect
+        if self.enabled:
+            self.frames.clear()
+            self.last_frame_start = None
+            self.overlay_time = 0.0
+        else:
+            self.unwrap()
+            self.current = None
+            self.overlay = None
+            self.overlay_rect = pygame.Rect(0, 0, 0, 0)
+        print('DEBUG: Frame profiler ' + ('on.' if self.enabled else 'off.'))
+        return rect
+
+    def begin_frame(self, elements):
+        """
+        Start timing a frame.
+        elements - the top-level UI elements, whose update() gets timed
+        """
+        if not self.enabled:
+            return
+        self.wrap(elements)
+        now = time.perf_counter()
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.current["windows"] = {}
+        self.current["interval"] = (
+            now - self.last_frame_start if self.last_frame_start is not None else 0.0
+        )
+        self.frame_start = now
+        self.last_frame_start = now
+
+    def end_frame(self):
+        """ Finish timing the frame. """
+        if not self.enabled or self.current is None:
+            return
+        self.current["t"] = self.frame_start - self.start
+        self.current["frame"] = time.perf_counter() - self.frame_start
+        self.frames.append(self.current)
+        self.current = None
+
+    def add(self, name, seconds):
+        if self.current is not None:
+            self.current[name] = self.current.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def _section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def section(self, name):
+        """ Context manager adding the time spent in its block to 'name'. """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._section(name)
+
+    def timed(self, name, func):
+        """ Wrap func so the time spent in it is added to section 'name'. """
+
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - started)
+
+        return wrapper
+
+    def wrap(self, elements):
+        """ Time the update() of every top-level element not timed yet. """
+        for element in elements:
+            if element in self.wrapped:
+                continue
+            update = element.update
+            timer = self.window_timer(type(element).__name__, update)
+            self.wrapped[element] = (update, timer, "update" in vars(element))
+            element.update = timer
+
+        # Forget windows that were closed.
+        for element in [e for e in self.wrapped if not e.alive()]:
+            del self.wrapped[element]
+
+    def window_timer(self, name, update):
+        def timed_update(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return update(*args, **kwargs)
+            finally:
+                if self.current is not None:
+                    windows = self.current["windows"]
+                    windows[name] = windows.get(name, 0.0) + time.perf_counter() - started
+
+        return timed_update
+
+    def unwrap(self):
+        """
+        Restore the original update() of every timed element, unless
+        something else (the app lifecycle) has wrapped it since. Those
+        stay in self.wrapped, so wrap() does not time them twice.
+        """
+        kept = {}
+        for element, (update, timer, own) in self.wrapped.items():
+            if vars(element).get("update") is not timer:
+                kept[element] = (update, timer, own)
+            elif own:
+                element.update = update
+            else:
+                del element.update
+        self.wrapped = kept
+
+    def averages(self, count=None):
+        """
+        Mean milliseconds per frame over the last 'count' frames:
+        ({section: ms}, {window: ms}).
+        """
+        frames = list(self.frames)[-(count or self.OVERLAY_FRAMES):]
+        if not frames:
+            return {}, {}
+        sections = {}
+        for name in ("frame", "interval") + SECTIONS:
+            sections[name] = 1000 * sum(f[name] for f in frames) / len(frames)
+        windows = collections.Counter()
+        for frame in frames:
+            windows.update(frame["windows"])
+        windows = {name: 1000 * total / len(frames) for name, total in windows.items()}
+        return sections, windows
+
+    def refresh_overlay(self):
+        """
+        Re-render the overlay if it is due.
+        Returns the screen rects that need a redraw (old and new overlay).
+        """
+        if not self.enabled:
+            return []
+        now = time.perf_counter()
+        if now - self.overlay_time < self.OVERLAY_INTERVAL:
+            return []
+        self.overlay_time = now
+
+        if self.font is None:
+            try:
+                self.font = pygame.font.Font(self.font_path, self.FONT_SIZE)
+            except (OSError, FileNotFoundError, pygame.error):
+                self.font = pygame.font.Font(None, self.FONT_SIZE)
+
+        sections, windows = self.averages()
+        if sections:
+            fps = 1000 / sections["interval"] if sections["interval"] > 0 else 0
+            lines = ["frame %5.1f ms %3.0f fps" % (sections["frame"], fps)]
+            for name in SECTIONS:
+                lines.append("%-8s %5.1f" % (name, sections[name]))
+                if name == "update":
+                    for window, ms in sorted(windows.items(), key=lambda w: -w[1]):
+                        lines.append(" %-7s %5.1f" % (window[:7], ms))
+        else:
+            lines = ["profiling..."]
+
+        rendered = [self.font.render(line, False, self.WHITE, self.BLACK) for line in lines]
+        width = max(r.get_width() for r in rendered) + 2 * self.PADDING
+        height = self.LINE_HEIGHT * len(rendered) + 2 * self.PADDING
+        overlay = pygame.Surface((width, height))
+        overlay.fill(self.BLACK)
+        for i, line in enumerate(rendered):
+            overlay.blit(line, (self.PADDING, self.PADDING + i * self.LINE_HEIGHT))
+
+        old_rect = self.overlay_rect
+        self.overlay = overlay
+        self.overlay_rect = overlay.get_rect(topright=self.screen_rect.topright)
+        return [old_rect, self.overlay_rect]
+
+    def draw(self, surface):
+        """ Blit the overlay onto 'surface'. """
+        if self.overlay is not None:
+            surface.blit(self.overlay, self.overlay_rect)
+
+    def dump(self, path):
+        """
+        Write the recorded frames to 'path', as CSV if it ends in .csv and
+        as JSON otherwise. Times are in milliseconds.
+        """
+        frames = list(self.frames)
+        windows = sorted({name for frame in frames for name in frame["windows"]})
+        columns = ["t", "frame", "interval"] + list(SECTIONS)
+
+        rows = []
+        for frame in frames:
+            row = {name: round(1000 * frame[name], 3) for name in columns}
+            row["windows"] = {
+                name: round(1000 * ms, 3) for name, ms in frame["windows"].items()
+            }
+            rows.append(row)
+
+        try:
+            with open(path, "w", newline="") as f:
+                if path.endswith(".csv"):
+                    writer = csv.writer(f)
+                    writer.writerow(columns + ["window:" + name for name in windows])
+                    for row in rows:
+                        writer.writerow(
+                            [row[name] for name in columns]
+                            + [row["windows"].get(name, 0) for name in windows]
+                        )
+                else:
+                    json.dump({"sections": columns, "windows": windows, "frames": rows}, f)
+            print("DEBUG: Frame trace written to " + path)
+        except OSError as e:
+            print("ERROR: Could not write frame trace: " + str(e))
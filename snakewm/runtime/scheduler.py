@@ -0,0 +1,113 @@
+"""
+scheduler: idle-aware frame pacing for the snakewm main loop.
+
+The WM runs at full rate while the user is giving input, or while any
+app or dynamic background asks for animation. Otherwise it drops to a
+low idle rate and blocks on pygame.event.wait(), so an idle desktop
+sleeps instead of spinning, and wakes up on the first input event.
+
+Apps and backgrounds ask for animation with a FRAME_RATE attribute:
+    FRAME_RATE = 15   # redraw at least 15 times a second
+    FRAME_RATE = 0    # static; only changes in response to input
+"""
+
+import time
+
+import pygame
+
+from .input import INPUT_EVENTS as HARDWARE_EVENTS, SIDEBUTTON_DOWN, SIDEBUTTON_UP
+
+# Event types that count as user activity.
+INPUT_EVENTS = (
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.TEXTINPUT,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEWHEEL,
+) + HARDWARE_EVENTS
+
+
+def requested_rate(element):
+    """ Frame rate an app or background asks for. 0 means static. """
+    return getattr(element, "FRAME_RATE", 0) or 0
+
+
+class FrameScheduler:
+    """ Decides how long the main loop sleeps before the next frame. """
+
+    ACTIVE_FPS = 60  # while typing, pointing, or animating at full rate
+    IDLE_FPS = 2  # nothing to do: wake up just for clocks and carets
+    IDLE_AFTER = 2.0  # seconds without input before dropping to idle
+
+    def __init__(self, active_fps=ACTIVE_FPS, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER):
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+
+        self.clock = pygame.time.Clock()
+        self.last_frame = pygame.time.get_ticks()
+        self.last_input = time.monotonic()
+
+        # Keys and mouse buttons currently held down. Holding a key is
+        # activity even though it produces no new events.
+        self.held = set()
+
+        # Frame rate chosen for the most recent frame.
+        self.rate = active_fps
+
+    def target_rate(self, requested=0):
+        """ Frame rate for the next frame, given the rate apps requested. """
+        if self.held or time.monotonic() - self.last_input < self.idle_after:
+            return self.active_fps
+        return max(self.idle_fps, min(requested, self.active_fps))
+
+    def next_frame(self, requested=0):
+        """
+        Sleep until the next frame is due, and return (delta, events).
+        requested - highest FRAME_RATE asked for by apps and backgrounds
+        """
+        self.rate = self.target_rate(requested)
+
+        if self.rate >= self.active_fps:
+            # Busy: fixed-rate tick, so input floods cannot exceed the cap.
+            delta_ms = self.clock.tick(self.active_fps)
+            events = pygame.event.get()
+        else:
+            # Quiet: sleep until the frame is due, or until input arrives.
+            events = []
+            wait_ms = int(1000 / self.rate) - (pygame.time.get_ticks() - self.last_frame)
+            if wait_ms > 0:
+                event = pygame.event.wait(wait_ms)
+                if event.type != pygame.NOEVENT:
+                    events.append(event)
+            events.extend(pygame.event.get())
+            delta_ms = self.clock.tick()
+
+        self.last_frame = pygame.time.get_ticks()
+        self.note_input(events)
+        return delta_ms / 1000.0, events
+
+    def note_input(self, events):
+        """ Track user activity and held keys/buttons from a batch of events. """
+        for event in events:
+            if event.type not in INPUT_EVENTS:
+                continue
+            self.last_input = time.monotonic()
+            if event.type == pygame.KEYDOWN:
+                self.held.add(("key", event.key))
+            elif event.type == pygame.KEYUP:
+                self.held.discard(("key", event.key))
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                self.held.add(("mouse", event.button))
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.held.discard(("mouse", event.button))
+            elif event.type == SIDEBUTTON_DOWN:
+                self.held.add(("sidebutton",))
+            elif event.type == SIDEBUTTON_UP:
+                self.held.discard(("sidebutton",))
+
+    def wake(self):
+        """ Treat now as user activity, e.g. after a hardware button press. """
+        self.last_input = time.monotonic()
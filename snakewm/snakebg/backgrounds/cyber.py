@@ -8,8 +8,14 @@ import math
 import random
 import pygame
 
-# horizontal line offsets for "scrolling effect"
-CYBER_OFFS = 0
+# The grid scrolls through PERIOD frames at FRAME_RATE, and repeats.
+# SnakeBG renders each frame once, as a 1-bit mask in the MONO color.
+FRAME_RATE = 15
+PERIOD = 25
+MONO = (255, 0, 255)
+
+# The ship follows the mouse at this rate, over the cached grid.
+SPRITE_FRAME_RATE = 30
 
 # list of tuples containing star information
 # (x, y, radius)
@@ -19,10 +25,9 @@ CYBER_STARS = None
 CYBER_SHIP_X = 200
 
 
-def drawbg(surface):
-    global CYBER_OFFS
+def drawstatic(surface):
+    """ Draw the parts that never move: horizon, rays, stars and sun. """
     global CYBER_STARS
-    global CYBER_SHIP_X
 
     SURF_WIDTH = surface.get_width()
     SURF_HEIGHT = surface.get_height()
@@ -59,28 +64,6 @@ def drawbg(surface):
             ),
         )
 
-    # draw horizontal lines
-    y = (SURF_HEIGHT / 2) - 20
-    dy = 1
-    while y <= SURF_HEIGHT:
-        ty = y + CYBER_OFFS * (dy / 10)
-        if ty > SURF_HEIGHT / 2:
-            pygame.draw.line(surface, (255, 0, 255), (0, ty), (SURF_WIDTH, ty))
-
-        y = y + dy
-        dy = dy + 5
-
-    CYBER_OFFS = CYBER_OFFS + 0.1
-    if CYBER_OFFS > 10:
-        CYBER_OFFS = 0
-
-    # draw ship
-    draw_ship(
-        surface, (int(SURF_WIDTH / 2), int(SURF_HEIGHT / 2)), CYBER_SHIP_X / SURF_WIDTH
-    )
-
-    CYBER_SHIP_X = CYBER_SHIP_X - int((CYBER_SHIP_X - pygame.mouse.get_pos()[0]) / 50)
-
     # draw stars
     for star in CYBER_STARS:
         pygame.draw.circle(surface, (0, 255, 255), (star[0], star[1]), star[2])
@@ -96,11 +79,47 @@ def drawbg(surface):
     )
 
 
+def drawframe(surface, frame):
+    """ Draw the horizontal grid lines, scrolled for loop frame 'frame'. """
+    SURF_WIDTH = surface.get_width()
+    SURF_HEIGHT = surface.get_height()
+
+    # horizontal line offset for "scrolling effect", 0 to 10 over the loop
+    offs = frame * 10 / PERIOD
+
+    y = (SURF_HEIGHT / 2) - 20
+    dy = 1
+    while y <= SURF_HEIGHT:
+        ty = y + offs * (dy / 10)
+        if ty > SURF_HEIGHT / 2:
+            pygame.draw.line(surface, MONO, (0, ty), (SURF_WIDTH, ty))
+
+        y = y + dy
+        dy = dy + 5
+
+
+def drawsprites(surface):
+    """ Draw the ship, easing toward the mouse. Returns the rect drawn. """
+    global CYBER_SHIP_X
+
+    SURF_WIDTH = surface.get_width()
+    SURF_HEIGHT = surface.get_height()
+
+    rect = draw_ship(
+        surface, (int(SURF_WIDTH / 2), int(SURF_HEIGHT / 2)), CYBER_SHIP_X / SURF_WIDTH
+    )
+
+    # close 1/25 of the gap each sprite frame (1/50 at 60 FPS before)
+    CYBER_SHIP_X = CYBER_SHIP_X - int((CYBER_SHIP_X - pygame.mouse.get_pos()[0]) / 25)
+    return [rect]
+
+
 def draw_ship(surface, origin, dx):
     """
     Draw the "space ship"
     origin - tuple representing center of the screen
     dx - (shipX / screen_width)
+    Returns the rect drawn.
     """
     fx = (
         origin[0] - int(math.cos(math.radians(dx * 180)) * 700),
@@ -117,4 +136,4 @@ def draw_ship(surface, origin, dx):
         origin[1] + int(math.sin(math.radians((dx + 0.1) * 180)) * 500),
     )
 
-    pygame.draw.polygon(surface, (0, 255, 255), (fx, fl, fr), 12)
+    return pygame.draw.polygon(surface, (0, 255, 255), (fx, fl, fr), 12)
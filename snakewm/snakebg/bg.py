@@ -2,26 +2,156 @@
 SnakeBG - dynamic backgrounds for SnakeWM!
 
 Joshua Moore 2020
+
+A background module either draws every frame itself:
+
+    drawbg(surface)         paint the whole of 'surface'
+
+or declares a loop, which SnakeBG renders once per frame and replays:
+
+    PERIOD = 25             frames in the loop
+    FRAME_RATE = 15         loop frames a second
+    drawstatic(surface)     optional: the parts that never change
+    drawframe(surface, i)   loop frame i, on top of the static layer;
+                            must depend on i only
+    MONO = (255, 0, 255)    optional: drawframe() only draws this one
+                            color (on a transparent surface), so frames
+                            are kept as 1-bit masks
+    drawsprites(surface)    optional: parts that follow input, drawn
+                            over the loop; returns the rects drawn
+    SPRITE_FRAME_RATE = 30  optional: sprite redraws a second
+
+Backgrounds paint every pixel; the wallpaper is not drawn under them.
 """
 
 import importlib
+import time
+
+import pygame
+
+# Loop frames kept as full surfaces past this many bytes are redrawn
+# each time instead. 1-bit frames are 1/32 the size and always kept.
+MAX_CACHE_BYTES = 8 * 1024 * 1024
 
 
 class SnakeBG:
     # reference to the imported background
     _BG = None
 
-    def __init__(self, bgname, testmode):
+    # frame rate to animate at; a background module may set its own
+    FRAME_RATE = 60
+
+    def __init__(self, bgname, testmode, size=(400, 240)):
         bgmod = "snakebg.backgrounds." + bgname
         if not testmode:
             bgmod = "snakewm." + bgmod
 
         # actually import the background
         self._BG = importlib.import_module(bgmod)
+        self.FRAME_RATE = getattr(self._BG, "FRAME_RATE", self.FRAME_RATE)
+
+        # the finished background, blitted by the WM under the UI
+        self.surface = pygame.Surface(size).convert()
+        self.rect = self.surface.get_rect()
+
+        self.period = getattr(self._BG, "PERIOD", None)
+        if self.period is None:
+            return
+
+        # looping background: static layer, cached loop frames, sprites
+        self.sprite_rate = getattr(self._BG, "SPRITE_FRAME_RATE", 0)
+        self.FRAME_RATE = max(self.FRAME_RATE, self.sprite_rate)
+        self.static = pygame.Surface(size).convert()
+        self.static.fill((0, 0, 0))
+        if hasattr(self._BG, "drawstatic"):
+            self._BG.drawstatic(self.static)
+        self.mono = getattr(self._BG, "MONO", None)
+        self.frames = {}
+        self.cache_bytes = 0
+        # MONO loop frame -> the rects its set pixels lie in. Only those
+        # change between two loop frames.
+        self.frame_bounds = {}
+
+        # static layer plus the current loop frame, without sprites
+        self.base = pygame.Surface(size).convert()
+        self.frame = None
+        self.sprite_rects = []
+        self.start = time.monotonic()
+        self.last_sprites = 0
+
+    def loop_frame(self, i):
+        """ Loop frame i, rendered on first use: a Mask for MONO backgrounds, else a Surface. """
+        frame = self.frames.get(i)
+        if frame is not None:
+            return frame
+
+        if self.mono is not None:
+            layer = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self._BG.drawframe(layer, i)
+            frame = pygame.mask.from_surface(layer)
+            self.frames[i] = frame
+            self.frame_bounds[i] = frame.get_bounding_rects()
+            return frame
 
-    def draw(self, surface):
+        frame = self.static.copy()
+        self._BG.drawframe(frame, i)
+        size = frame.get_bytesize() * frame.get_width() * frame.get_height()
+        if self.cache_bytes + size <= MAX_CACHE_BYTES:
+            self.frames[i] = frame
+            self.cache_bytes += size
+        return frame
+
+    def update(self):
+        """
+        Bring self.surface up to date.
+        Returns the rects of it that changed.
+        """
         # draw the background if the _BG module is set
         if self._BG is None:
-            return
+            return []
+
+        if self.period is None:
+            self._BG.drawbg(self.surface)
+            return [self.rect.copy()]
+
+        now = time.monotonic()
+        i = int((now - self.start) * getattr(self._BG, "FRAME_RATE", self.FRAME_RATE)) % self.period
+        if i != self.frame:
+            last = self.frame
+            self.frame = i
+            frame = self.loop_frame(i)
+            if self.mono is not None and last is not None:
+                # only the old and new frame's pixels change
+                changed = self.frame_bounds[last] + self.frame_bounds[i]
+                for rect in self.frame_bounds[last]:
+                    self.base.blit(self.static, rect, rect)
+                frame.to_surface(self.base, setcolor=self.mono, unsetcolor=None)
+            else:
+                changed = [self.rect.copy()]
+                if self.mono is not None:
+                    self.base.blit(self.static, (0, 0))
+                    frame.to_surface(self.base, setcolor=self.mono, unsetcolor=None)
+                else:
+                    self.base.blit(frame, (0, 0))
+            old = self.sprite_rects
+            for rect in changed + old:
+                self.surface.blit(self.base, rect, rect)
+            self.sprite_rects = self.draw_sprites()
+            self.last_sprites = now
+            return changed + old + self.sprite_rects
+
+        if self.sprite_rate and now - self.last_sprites >= 1.0 / self.sprite_rate:
+            # only the sprites move: put back what was under them, redraw them
+            self.last_sprites = now
+            old = self.sprite_rects
+            for rect in old:
+                self.surface.blit(self.base, rect, rect)
+            self.sprite_rects = self.draw_sprites()
+            return old + self.sprite_rects
+        return []
 
-        self._BG.drawbg(surface)
+    def draw_sprites(self):
+        if not hasattr(self._BG, "drawsprites"):
+            return []
+        rects = self._BG.drawsprites(self.surface) or []
+        return [rect.clip(self.rect) for rect in rects if rect.colliderect(self.rect)]
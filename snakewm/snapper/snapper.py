@@ -9,15 +9,16 @@ from pygame_gui.elements import UIPanel
 from pygame_gui.elements import UIStatusBar
 from pygame_gui.elements import UIHorizontalSlider
 from pygame_gui.elements.ui_image import UIImage
-import re
 import time
-import subprocess
+
+from runtime.metrics import shared_metrics
 
 class Snapper(UIPanel):
     """ A widget panel that snaps out from the edge of the screen. """
     manager = None
     SCREENSIZE = (400,240)
     DIMS = (87,120)
+    FRAME_RATE = 0  # the clock changes once a minute; idle frames are enough
     path = None
 
     BLACK = ((0,)*3)
@@ -40,6 +41,10 @@ class Snapper(UIPanel):
         if platform.system() == 'Linux':
             self.PLATFORM = 'Linux'
 
+        # Battery and other readings are taken on a worker thread; the
+        # status bars only look up the last values.
+        self.METRICS = shared_metrics()
+
         # Initialize main display surface to contain entire app UI.
         self.display_surf = UIImage(
             relative_rect=pygame.Rect((0, 0), self.DIMS),
@@ -91,8 +96,7 @@ class Snapper(UIPanel):
             parent_element=self,
             object_id=ObjectID(class_id="@snapper_statusbar",
                                object_id="#snapper_battery_statusbar"
-            ),
-            percent_method=self.get_battery_status
+            )
         )
 
         # Draw status glyph on battery's right side.
@@ -112,19 +116,18 @@ class Snapper(UIPanel):
         wifi_y = 80
         wifi_w = 69
         wifi_h = 23
-        self.battery_icon = UIStatusBar(
+        self.wifi_icon = UIStatusBar(
             relative_rect=pygame.Rect(wifi_x,wifi_y,wifi_w,wifi_h),
             manager=manager,
             container=self,
             parent_element=self,
             object_id=ObjectID(class_id="@snapper_statusbar",
                                object_id="#snapper_wifi_statusbar"
-            ),
-            percent_method=self.get_wifi_status
+            )
         )
 
         # Draw status glyph on wifi bar's right side.
-        self.battery_glyph = UILabel(
+        self.wifi_glyph = UILabel(
             relative_rect=pygame.Rect(wifi_w+5,wifi_y+1,20,20),
             text="w",
             manager=manager,
@@ -135,63 +138,37 @@ class Snapper(UIPanel):
             )
         )
 
+        # Widget -> the value it shows. Widgets are redrawn only when
+        # their value changes.
+        self.shown = {}
+        self.draw_frame()
+        self.draw_widgets()
+
     def update(self, delta):
         """ Every frame, do the following. """
         super().update(delta)
          # limit frame rate to 4 FPS
         if time.time() - self.last_time > 0.25:
-            self.display_surf.image.blit(self.draw_widgets(),(0,0))
+            self.draw_widgets()
             self.last_time = time.time()
 
     def get_battery_status(self):
-        if self.PLATFORM == 'Darwin':
-            output = subprocess.run(['pmset','-g','batt'],capture_output=True)
-            regex = re.compile('([0-9]{1,3})%;.*?$')
-            for match in re.findall(regex, str(output.stdout)):
-                output_int = int(match)
-            return output_int
-        if self.PLATFORM == 'Linux':
-            output = subprocess.run(["cat","/sys/firmware/beepy/battery_percent"],capture_output=True)
-            output_int = int(output.stdout)
-            return output_int
+        # 0 until the first reading, and off a beepy (desktop, or the
+        # benchmark harness), where there is no battery to read.
+        return self.METRICS.get("battery", 0)
 
     def get_wifi_status(self):
-        # TODO: Get working.
-        output_int = [100,100]
         if self.PLATFORM == 'Darwin':
-            # TODO: wdutil works, but needs sudo
-            output_int[0] = 100  # percentage; currently we substitute 100%
-            output_int[1] = 100
-            return(output_int[0])
-        if self.PLATFORM == 'Linux':
-            return(20)
-            """
-            try:
-                regex = re.compile("^.*Quality=([0-9]{1,3})/([0-9]{1,3})\s")
-                output = subprocess.run(["iwlist","scan"])
-                matches = re.findall(regex, str(output.stdout))
-                #print(matches[0])
-                #print(matches[1])
-                #return(matches[0])
-                print('match')
-                return(0)
-            except:
-                return(0)  # default to 0% if iwlist fails
-            """
-
-    def draw_widgets(self):
-        """ Draw widget cluster. """
-        widget_surface = pygame.Surface(self.DIMS)
+            # TODO: wdutil works, but needs sudo. Substitute 100%.
+            return 100
+        # Smoothed link quality from /proc/net/wireless; 0 when not connected.
+        return self.METRICS.get("wifi", 0)
+
+    def draw_frame(self):
+        """ Draw the panel's background and frame, once. """
+        widget_surface = self.display_surf.image
         widget_surface.fill(self.WHITE)
 
-        # Clock
-        # --------------------------
-        dt = datetime.datetime.now()
-        short_time = dt.strftime("%H:%M")
-        short_date = dt.strftime("%m-%d")
-        self.time_label.set_text(short_time)
-        self.date_label.set_text(short_date)
-
         # Load widget icons for snapper.
         """
         i_bluetooth = pygame.image.load(os.path.join(self.images_path,'bluetooth.png'))
@@ -216,7 +193,27 @@ class Snapper(UIPanel):
                                       (0,self.DIMS[1]-1),(self.DIMS[0],self.DIMS[1]-1)]
                           )
 
-        return widget_surface
+    def draw_widgets(self):
+        """
+        Redraw the widgets whose value changed since the last call. The
+        compositor finds the widgets that changed by itself, in track_ui().
+        """
+        # Clock: the labels only change when the minute does.
+        minute = int(time.time() // 60)
+        if self.shown.get("minute") != minute:
+            self.shown["minute"] = minute
+            dt = datetime.datetime.now()
+            for label, text in ((self.time_label, dt.strftime("%H:%M")),
+                                (self.date_label, dt.strftime("%m-%d"))):
+                if label.text != text:
+                    label.set_text(text)
+
+        # Status bars: redrawn on a whole percent change.
+        for bar, percent in ((self.battery_icon, self.get_battery_status()),
+                             (self.wifi_icon, self.get_wifi_status())):
+            if self.shown.get(bar) != percent:
+                self.shown[bar] = percent
+                bar.percent_full = percent / 100
 
     def destroy(self):
         """ Kill the snapper panel. """
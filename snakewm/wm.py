@@ -15,8 +15,20 @@ import io
 import os
 import pwd
 import sys
+import time
 import importlib
 
+# Startup import profiling. Set SNAKEWM_IMPORT_PROFILE to a log path to
+# record the cost of every import up to the first frame.
+IMPORT_PROFILER = None
+if os.environ.get('SNAKEWM_IMPORT_PROFILE'):
+    if TESTMODE:
+        from runtime.importprof import ImportProfiler
+    else:
+        from snakewm.runtime.importprof import ImportProfiler
+    IMPORT_PROFILER = ImportProfiler(os.environ['SNAKEWM_IMPORT_PROFILE'])
+    IMPORT_PROFILER.install()
+
 # Third party imports
 import pygame
 import pygame_gui
@@ -43,26 +55,24 @@ REAL_PI = is_raspi()
 
 # IMPORTS 2 - These modules require actual hardware (Pi Zero only)
 # ================================================================
-if REAL_PI == True:
-    print('DEBUG: Running on raspi hardware.')
-    import gpiozero  # for beepy sidebutton (GPIO 17 -> GND)
-    SIDEBUTN = gpiozero.Button(17)
-    # TODO: Make a mock pin for desktops, and map it to the tilde key
-    # https://gpiozero.readthedocs.io/en/stable/api_pins.html#mock-pins
-if REAL_PI == False:
-    print('DEBUG: Not running on raspi hardware.')
-    print('DEBUG: GPIO functions will not work.')
-    try:
-        print('DEBUG: Attempting to import gpiozero module.')
-        import gpiozero
-        print('DEBUG: Imported gpiozero. Attempting to import mock pin factory.')
-        from gpiozero.pins.mock import MockFactory
-        print('DEBUG: gpiozero.pins.mock.MockFactory successfully imported.')
-    except:
-        print('ERROR: Could not import gpiozero module.')
-        print('ERROR: To fix, "python3 -m pip install gpiozero"')
-    gpiozero.Device.pin_factory = MockFactory()
-    print('DEBUG: Built mock pin factory.')
+# gpiozero takes a while to import, and is not needed to draw the first
+# frame, so SnakeWM.run() calls this once the first frame is on screen.
+# The side button posts SIDEBUTTON_DOWN/UP events from gpiozero's thread.
+SIDEBUTN = None
+def init_hardware():
+    global SIDEBUTN
+    if REAL_PI == True:
+        print('DEBUG: Running on raspi hardware.')
+        SIDEBUTN = SideButton()  # beepy sidebutton (GPIO 17 -> GND)
+    if REAL_PI == False:
+        print('DEBUG: Not running on raspi hardware.')
+        print('DEBUG: GPIO functions will not work. The tilde key is the side button.')
+        try:
+            SIDEBUTN = SideButton(mock=True)
+            print('DEBUG: Built mock pin factory.')
+        except ImportError:
+            print('ERROR: Could not import gpiozero module.')
+            print('ERROR: To fix, "python3 -m pip install gpiozero"')
 
 # establish PYTHONPATH - needed for local application imports
 if 'PYTHONPATH' not in os.environ:
@@ -81,18 +91,51 @@ if TESTMODE:
         print('DEBUG: wm.py: PYTHONPATH = ' + os.environ['PYTHONPATH'])
     except:
         raise
-    from appmenu.appmenupanel import AppMenuPanel
-    from snapper import Snapper
-
-    from snakebg.bg import SnakeBG
-    from snakebg.bgmenu import SnakeBGMenu
+    from appmenu.manifest import AppManifest, CACHE_DIR
+    from runtime import appstats
+    from display.compositor import Compositor
+    from display.cursor import CursorPlane
+    from display.occlusion import update_occlusion
+    from runtime.scheduler import FrameScheduler, requested_rate
+    from runtime.lifecycle import AppLifecycle, app_rate
+    from runtime.lazyimport import lazy_import
+    from runtime.preload import AppPreloader, APP_READY
+    from runtime.profiler import FrameProfiler
+    from runtime.input import SideButton, SIDEBUTTON_DOWN, MOCK_KEY, coalesce_motion
+
+    # Not needed for the first frame. Loaded on first use.
+    appmenupanel = lazy_import('appmenu.appmenupanel')
+    searchpanel = lazy_import('appmenu.searchpanel')
+    search = lazy_import('appmenu.search')
+    loading = lazy_import('appmenu.loading')
+    snapper = lazy_import('snapper')
+    dynbg = lazy_import('snakebg.bg')
+    bgmenu = lazy_import('snakebg.bgmenu')
+    sharpfb = lazy_import('display.sharpfb')
 else:
     print('DEBUG: wm.py: Test mode is deactivated.')
-    from appmenu.appmenupanel import AppMenuPanel
-    from snapper import Snapper
-
-    from snakewm.snakebg.bg import SnakeBG
-    from snakewm.snakebg.bgmenu import SnakeBGMenu
+    from appmenu.manifest import AppManifest, CACHE_DIR
+    # Shared with snakeye, which imports it as runtime.appstats.
+    from runtime import appstats
+    from snakewm.display.compositor import Compositor
+    from snakewm.display.cursor import CursorPlane
+    from snakewm.display.occlusion import update_occlusion
+    from snakewm.runtime.scheduler import FrameScheduler, requested_rate
+    from snakewm.runtime.lifecycle import AppLifecycle, app_rate
+    from snakewm.runtime.lazyimport import lazy_import
+    from snakewm.runtime.preload import AppPreloader, APP_READY
+    from snakewm.runtime.profiler import FrameProfiler
+    from snakewm.runtime.input import SideButton, SIDEBUTTON_DOWN, MOCK_KEY, coalesce_motion
+
+    # Not needed for the first frame. Loaded on first use.
+    appmenupanel = lazy_import('appmenu.appmenupanel')
+    searchpanel = lazy_import('appmenu.searchpanel')
+    search = lazy_import('appmenu.search')
+    loading = lazy_import('appmenu.loading')
+    snapper = lazy_import('snapper')
+    dynbg = lazy_import('snakewm.snakebg.bg')
+    bgmenu = lazy_import('snakewm.snakebg.bgmenu')
+    sharpfb = lazy_import('snakewm.display.sharpfb')
 
 LAUNCHDIR = os.getcwd()
 print('DEBUG: LAUNCHDIR = ' + LAUNCHDIR)
@@ -104,6 +147,12 @@ class SnakeWM:
     DIMS = None
     BG = None
     MANAGER = None
+    COMPOSITOR = None
+    CURSOR = None
+    FRAMEBUFFER = None
+    SCHEDULER = None
+    PROFILER = None
+    LIFECYCLE = None
 
     BG_COLOR = ((255,)*3)
 
@@ -112,6 +161,11 @@ class SnakeWM:
     #LANGUAGE = 'fr'  # fr-FR, French, français
     #LANGUAGE = 'ja'  # ja-JP, Japanese, 日本語
 
+    # Display output. Uncomment the backend you want to use.
+    DISPLAY_BACKEND = 'sdl'    # SDL converts and pushes the frame (desktops, simulator)
+    #DISPLAY_BACKEND = 'sharp'  # changed 1-bit rows go straight to /dev/fb1 (beepy)
+    FBDEV = '/dev/fb1'
+
     # Import theme file for the UI manager.
     THEMEFILE = os.path.join(WM_DIR, 'data/themes/glowfire.json')
     print('DEBUG: THEMEFILE: ' + str(THEMEFILE))
@@ -145,25 +199,36 @@ class SnakeWM:
 
     # dictionary that will contain the apps directory structure
     APPS = {}
+    # cached manifest the apps dictionary is built from
+    MANIFEST = None
     # reference to the root app menu object
     APPMENU = None
+    # type-to-search launcher shown next to the app menu
+    SEARCH = None
     # reference to the 'snapper' widget panel
     SNAPPER = None
+    # loads apps in the background
+    PRELOADER = None
+    # app module name -> (placeholder window, params) for apps still loading
+    LOADING = None
 
     def __init__(self):
-        # populate the apps tree
+        # populate the apps tree from the cached manifest, and re-check
+        # the apps directory in the background
         apps_path = os.path.dirname(os.path.abspath(__file__)) + "/apps"
         print('DEBUG: apps_path: ' + str(apps_path))
-        SnakeWM.iter_dir(self.APPS, apps_path)
+        self.MANIFEST = AppManifest(apps_path)
+        self.APPS = self.MANIFEST.tree()
+        self.MANIFEST.refresh_async(self.apps_changed)
 
-        pygame.init()
+        # attribute threads started by apps to them, for snakeye
+        appstats.install()
 
-        # Initialize the button events into pygame's event system.
-        SIDEBUTN_DOWN = pygame.event.Event(pygame.USEREVENT+0)
-        SIDEBUTN_UP   = pygame.event.Event(pygame.USEREVENT+1)
-        # Hardware GPIO triggers gpiozero events for press and release.
-        #SIDEBUTN.when_pressed  = pygame.event.post(SIDEBUTN_DOWN)
-        #SIDEBUTN.when_released = pygame.event.post(SIDEBUTN_UP)
+        # import apps and decode their assets off the UI thread
+        self.PRELOADER = AppPreloader(os.path.join(CACHE_DIR, 'recentapps.json'))
+        self.LOADING = {}
+
+        pygame.init()
 
         # Initialize pygame to framebuffer.
         os.putenv("SDL_FBDEV", "/dev/fb1")
@@ -217,17 +282,40 @@ class SnakeWM:
 
         self.CURSOR_IMG = pygame.image.load(self.CURSORFILE).convert()
 
-    def iter_dir(tree, path):
+        # Initialize the display output backend.
+        display_update = pygame.display.update
+        if self.DISPLAY_BACKEND == 'sharp':
+            try:
+                self.FRAMEBUFFER = sharpfb.SharpFramebuffer(self.SCREEN, device=self.FBDEV)
+                display_update = self.FRAMEBUFFER.update
+                print('DEBUG: Writing 1-bit frames to ' + self.FBDEV)
+            except (ImportError, OSError) as e:
+                print('ERROR: Could not open Sharp framebuffer: ' + str(e))
+                print('ERROR: Falling back to SDL display output.')
+
+        # Initialize the frame profiler (Ctrl+Shift+F), and time display updates with it.
+        self.PROFILER = FrameProfiler(self.SCREEN.get_rect(),
+                                      os.path.join(WM_DIR, 'data/fonts/ProFontIIx/ProFontIIx.ttf'))
+        display_update = self.PROFILER.timed('display', display_update)
+
+        # Initialize the compositor, which pushes only changed regions to the display.
+        self.COMPOSITOR = Compositor(self.SCREEN, self.MANAGER, display_update)
+
+        # Track app focus and visibility, and call their suspend/resume hooks.
+        self.LIFECYCLE = AppLifecycle()
+
+    def apps_changed(self, manifest):
         """
-        Static function that recursively populates dict 'tree' with the
-        app directory structure starting at 'path'.
+        Called from the manifest's background thread when apps were added
+        or removed. The app menu picks up the new tree the next time it opens.
         """
-        for f in os.listdir(path):
-            if os.path.isfile(path + "/" + f + "/__init__.py"):
-                tree[f] = None
-            elif os.path.isdir(path + "/" + f):
-                tree[f] = {}
-                SnakeWM.iter_dir(tree[f], path + "/" + f)
+        self.APPS = manifest.tree()
+
+    def app_module(self, app):
+        """ Full module name of an app path like "apps.test.HelloWorld". """
+        if not TESTMODE:
+            app = "snakewm." + app
+        return app
 
     def loadapp(self, app, params=None):
         """
@@ -235,28 +323,163 @@ class SnakeWM:
         Apps are basically just Python packages. The loaded app package must contain an __init__.py with a load() function that accepts a UIManager parameter and a params list parameter.
 
         The load() function should create an instance of the app to load and add the app UI to the passed UIManager object. See existing apps for examples.
-        """
-        if not TESTMODE:
-            app = "snakewm." + app
 
+        The package may also have a preload() function, which decodes the
+        app's assets into runtime.assets. Apps are imported and preloaded on
+        a worker thread; until that is done a placeholder window is shown.
+        """
+        app = self.app_module(app)
+        self.PRELOADER.used(app)
+
+        if self.PRELOADER.error(app) is not None:
+            # A background preload failed with nobody waiting on it: start
+            # over, so the request below queues it again.
+            self.PRELOADER.forget(app)
+
+        if self.PRELOADER.is_ready(app):
+            self.start_app(app, params)
+            return
+
+        if app not in self.LOADING:
+            pos = (0, 0)
+            if params is not None and len(params) > 0:
+                pos = params[0]
+            self.LOADING[app] = (loading.LoadingWindow(pos, self.MANAGER, app), params)
+        self.PRELOADER.request(app, urgent=True)
+
+    def start_app(self, app, params=None):
+        """ Create an instance of an imported app, on the UI thread. """
+        rss = appstats.rss_kb()
         _app = importlib.import_module(app)
 
         try:
             _app.load(self.MANAGER, params)
+            appstats.note_load(app, appstats.rss_kb() - rss)
         except:
             #print('DEBUG: App quit.')
             raise
             pygame.quit()
 
+    def app_ready(self, event):
+        """
+        Called when the preloader posts APP_READY. Replaces the placeholder
+        window, if there is one, with the app.
+        """
+        if event.app not in self.LOADING:
+            return
+        window, params = self.LOADING.pop(event.app)
+        window.kill()
+        if event.error is not None:
+            # Try again from scratch next time, and fail loudly as before.
+            self.PRELOADER.forget(event.app)
+            raise event.error
+        self.start_app(event.app, params)
+
+    def select_window(self, window):
+        """ Move keyboard focus to 'window'. """
+        if window is self.FOCUS:
+            return
+        if self.FOCUS is not None and self.FOCUS.alive():
+            self.FOCUS.unfocus()
+        self.FOCUS = window
+        self.FOCUS.focus()
+
+    def focused_window(self):
+        """
+        The window at the front of the window stack. pygame_gui moves new
+        and clicked windows there, before the WM sees their events.
+        """
+        stack = self.MANAGER.get_window_stack().stack
+        return stack[-1] if stack else None
+
+    def build_appmenu(self):
+        """
+        Build the app menu hidden, unless the one built before is still
+        current. Rebuilt only when the apps tree or the language changed.
+        """
+        apps = self.APPS
+        if self.APPMENU is not None:
+            if self.APPMENU.is_current(apps, self.MANAGER.get_locale()):
+                return
+            self.APPMENU.destroy()
+            self.SEARCH.kill()
+        self.APPMENU = appmenupanel.AppMenuPanel(
+            manager  = self.MANAGER,
+            pos      = (0,0),
+            path     = "apps",
+            elements = apps,
+            loadfunc = self.appmenu_load,
+            hoverfunc = self.appmenu_hover
+        )
+        self.APPMENU.close()
+        # The search index comes from the same manifest as the apps tree.
+        self.SEARCH = searchpanel.SearchPanel(
+            manager  = self.MANAGER,
+            index    = search.AppIndex.from_manifest(self.MANIFEST),
+            loadfunc = self.appmenu_load,
+            hoverfunc = self.appmenu_hover,
+            shortcutfunc = self.is_shortcut
+        )
+
+    def appmenu_open(self):
+        """ True while the app menu is on screen. """
+        return self.APPMENU is not None and self.APPMENU.visible
+
+    def toggle_appmenu(self):
+        """ Open the app menu and the snapper, or close them if open. """
+        if not self.appmenu_open():
+            # open app menu
+            self.build_appmenu()
+            self.APPMENU.open()
+            if self.SNAPPER is None:
+                # open snapper
+                self.SNAPPER = snapper.Snapper(self.MANAGER)
+        else:
+            self.APPMENU.close()
+            self.SEARCH.set_query("")
+            if self.SNAPPER is not None:
+                self.SNAPPER.destroy()
+                self.SNAPPER = None
+
+    def appmenu_search(self, event):
+        """
+        Pass keyboard input to the app search while the menu is open.
+        Returns True if the search used the event.
+        """
+        if not self.SEARCH.handle_key(event):
+            return False
+        if self.SEARCH.visible and self.APPMENU.sub is not None:
+            # results show where the sub panels do
+            self.APPMENU.sub.close()
+            self.APPMENU.sub = None
+        return True
+
+    def is_shortcut(self, event):
+        """
+        This function is passed to the SearchPanel. Returns True if the
+        KEYDOWN 'event' is one of the WM's own keys, which the search must
+        let through. (Ctrl chords never go to the search.)
+        """
+        if event.key == MOCK_KEY:
+            return not REAL_PI and SIDEBUTN is not None
+        return bool(event.mod & pygame.KMOD_LSHIFT) and event.key in (pygame.K_p, pygame.K_d)
+
+    def appmenu_hover(self, app):
+        """
+        This function is passed to AppMenuPanel objects to be called when
+        the pointer is over an app, which is likely to be opened next.
+        """
+        self.PRELOADER.request(self.app_module(app), urgent=True)
+
     def appmenu_load(self, app):
         """
         This function is passed to AppMenuPanel objects to be called when
         an app is selected to be opened.
-        The root app menu is destroyed, and the app is loaded.
+        The root app menu is closed, and the app is loaded.
         """
         if self.APPMENU is not None:
-            self.APPMENU.destroy()
-            self.APPMENU = None
+            self.APPMENU.close()
+            self.SEARCH.set_query("")
 
         self.loadapp(app)
 
@@ -267,6 +490,7 @@ class SnakeWM:
         self.BG = pygame.Surface((self.DIMS))
         self.BG_COLOR = color
         self.BG.fill(self.BG_COLOR)
+        self.COMPOSITOR.damage_all()
 
     def set_bg_image(self, file):
         """
@@ -275,62 +499,91 @@ class SnakeWM:
         filename, file_extension = os.path.splitext(file)
         if file_extension == ".jpg" or file_extension == ".png":
             self.BG = pygame.transform.scale(pygame.image.load(file), self.DIMS).convert()
+            self.COMPOSITOR.damage_all()
 
-    def run(self):
-        clock = pygame.time.Clock()
+    def requested_frame_rate(self):
+        """
+        Highest frame rate asked for by the apps, in their lifecycle state,
+        and the dynamic background. 0 means nothing is animating.
+        """
+        rate = 0
+        if self.DYNBG is not None:
+            rate = requested_rate(self.DYNBG)
+        for element in self.MANAGER.get_root_container().elements:
+            rate = max(rate, app_rate(element))
+        return rate
+
+    def run(self, scheduler=None):
+        """
+        Run the main loop.
+        scheduler - FrameScheduler pacing the loop; the benchmark harness
+                    passes one that feeds in scripted input
+        """
+        self.SCHEDULER = scheduler or FrameScheduler()
         running = True
+        first_frame = True
 
         self.CURSORIMAGE = pygame.image.load(self.CURSORFILE).convert_alpha()
         self.new_mouse_pos = (0,0)
+        # The cursor is a plane over the frame: moving it restores the
+        # pixels it covered instead of redrawing the desktop under it.
+        self.CURSOR = CursorPlane(self.SCREEN, self.CURSORIMAGE, self.new_mouse_pos)
+        self.COMPOSITOR.set_cursor(self.CURSOR)
+        self.brush_rect = pygame.Rect(0, 0, 0, 0)
 
         self.set_bg_image(self.WALLPAPER)
 
         while running:
-            delta = clock.tick(60) / 1000.0
-            pressed = pygame.key.get_pressed()
-            for event in pygame.event.get():
+            # Full rate on input or animation; otherwise sleep until input.
+            delta, events = self.SCHEDULER.next_frame(self.requested_frame_rate())
+            # One motion event per run of trackpad moves, not one per sample.
+            events = coalesce_motion(events)
+            self.PROFILER.begin_frame(self.MANAGER.get_root_container().elements)
+            for event in events:
+                if self.appmenu_open() and self.appmenu_search(event):
+                    # typed into the app search; keep it from the focused window
+                    continue
+
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        if self.APPMENU is None:
-                            # open app menu
-                            self.APPMENU = AppMenuPanel(
-                                manager  = self.MANAGER,
-                                pos      = (0,0),
-                                path     = "apps",
-                                elements = self.APPS,
-                                loadfunc = self.appmenu_load
-                            )
-                            if self.SNAPPER is None:
-                                # open snapper
-                                self.SNAPPER = Snapper(self.MANAGER)
-                        else:
-                            self.APPMENU.destroy()
-                            self.APPMENU = None
-                            if self.SNAPPER is not None:
-                                self.SNAPPER.destroy()
-                                self.SNAPPER = None
-
-                    elif event.key == pygame.K_b and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                        self.toggle_appmenu()
+
+                    elif event.key == MOCK_KEY and not REAL_PI and SIDEBUTN is not None:
+                        # the tilde key drives the mock side button
+                        SIDEBUTN.press()
+
+                    elif event.key == pygame.K_b and event.mod & pygame.KMOD_CTRL:
                         print("DEBUG: Pressed power key.")
                         running = False
                         pygame.quit()
                         exit()
 
-                    if pressed[pygame.K_LSHIFT]:
+                    if event.mod & pygame.KMOD_LSHIFT:
                         # TODO: Implement these features
                         if event.key == pygame.K_p:
                             # toggle paint mode
                             self.PAINT = not self.PAINT
                             self.BRUSH_SURF.fill((0, 0, 0, 0))
+                            self.COMPOSITOR.damage_all()
+                        elif event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL:
+                            # toggle frame profiler overlay
+                            self.COMPOSITOR.add_damage(self.PROFILER.toggle())
+                        elif event.key == pygame.K_t and event.mod & pygame.KMOD_CTRL:
+                            # dump frame profiler trace
+                            self.dump_frame_trace()
+                        elif event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+                            # record 1-bit frames for display/bench_rowdiff.py
+                            self.toggle_frame_recording()
                         elif event.key == pygame.K_d:
                             # toggle dynamic background
                             if self.DYNBG is None and self.DYNBG_MENU is None:
                                 print('DEBUG: toggle dynamic background ON')
-                                self.DYNBG_MENU = SnakeBGMenu(self.MANAGER)
+                                self.DYNBG_MENU = bgmenu.SnakeBGMenu(self.MANAGER)
                             elif self.DYNBG is not None:
                                 print('DEBUG: toggle dynamic background OFF')
                                 del self.DYNBG
                                 self.DYNBG = None
+                                self.COMPOSITOR.damage_all()
 
                 # Workaround for lack of a mouse cursor.
                 # Restrict coordinates to 400x240 Memory LCD.
@@ -360,33 +613,17 @@ class SnakeWM:
                     if event.button == 2:  # Middle click
                         pass # here for expansion
                     if event.button == 3:  # Right click
-                        if self.APPMENU is None:
-                            # open app menu
-                            self.APPMENU = AppMenuPanel(
-                                manager  = self.MANAGER,
-                                pos      = (0,0),
-                                path     = "apps",
-                                elements = self.APPS,
-                                loadfunc = self.appmenu_load
-                            )
-                            if self.SNAPPER is None:
-                                # open snapper
-                                self.SNAPPER = Snapper(self.MANAGER)
-                        else:
-                            self.APPMENU.destroy()
-                            self.APPMENU = None
-                            if self.SNAPPER is not None:
-                                self.SNAPPER.destroy()
-                                self.SNAPPER = None
+                        self.toggle_appmenu()
 
                     if self.PAINT:
+                        mods = pygame.key.get_mods()
                         if event.button == 4:
                             # mouse wheel up
-                            if pressed[pygame.K_LALT]:
+                            if mods & pygame.KMOD_LALT:
                                 self.PAINT_COLOR = (self.PAINT_COLOR + 1) % len(
                                     self.PAINT_COLOR_LIST
                                 )
-                            elif pressed[pygame.K_LCTRL]:
+                            elif mods & pygame.KMOD_LCTRL:
                                 self.PAINT_SHAPE = (
                                     self.PAINT_SHAPE + 1
                                 ) % self.NUM_SHAPES
@@ -394,11 +631,11 @@ class SnakeWM:
                                 self.PAINT_RADIUS += 2
                         elif event.button == 5:
                             # mouse wheel down
-                            if pressed[pygame.K_LALT]:
+                            if mods & pygame.KMOD_LALT:
                                 self.PAINT_COLOR = (self.PAINT_COLOR - 1) % len(
                                     self.PAINT_COLOR_LIST
                                 )
-                            elif pressed[pygame.K_LCTRL]:
+                            elif mods & pygame.KMOD_LCTRL:
                                 self.PAINT_SHAPE = (
                                     self.PAINT_SHAPE - 1
                                 ) % self.NUM_SHAPES
@@ -407,18 +644,29 @@ class SnakeWM:
                             if self.PAINT_RADIUS < 2:
                                 self.PAINT_RADIUS = 2
 
+                elif event.type == pygame.KEYUP:
+                    if event.key == MOCK_KEY and not REAL_PI and SIDEBUTN is not None:
+                        SIDEBUTN.release()
+
+                elif event.type == SIDEBUTTON_DOWN:
+                    # posted from gpiozero's thread
+                    self.toggle_appmenu()
+
+                elif event.type == APP_READY:
+                    self.app_ready(event)
+
+                elif event.type == pygame_gui.UI_WINDOW_MOVED_TO_FRONT:
+                    self.select_window(event.ui_element)
+
                 elif event.type == pygame.USEREVENT:
                     # Event Debugging: uncomment one or more of these to view UI events on stdout
                     #print("DEBUG: event.ui_object_id: " + str(event.ui_object_id))
                     #print("DEBUG: event.ui_element: " + str(event.ui_element))
                     #print("DEBUG: event.type: " + str(event.type))
                     #print(event.user_type)  # Note: will be removed in pygame-gui 0.8.0
-                    if event.type == "window_selected":
-                        # focus selected window
-                        if self.FOCUS is not None:
-                            self.FOCUS.unfocus()
-                        self.FOCUS = event.ui_element
-                        self.FOCUS.focus()
+                    if isinstance(event.user_type, str) and event.user_type == "window_selected":
+                        # posted by apps (tennis) when their title bar is clicked
+                        self.select_window(event.ui_element)
 
                     if event.ui_object_id == "#wallpaper_picker":
                         try:
@@ -443,71 +691,33 @@ class SnakeWM:
                             elif not "title_bar" in event.ui_object_id:
                                 print('DEBUG: Dynamic background selected.')
                                 selected_bg = event.ui_object_id.split(".")[1]
-                                self.DYNBG = SnakeBG(selected_bg, TESTMODE)
+                                self.DYNBG = dynbg.SnakeBG(selected_bg, TESTMODE, self.DIMS)
                                 self.DYNBG_MENU.kill()
                                 del self.DYNBG_MENU
                                 self.DYNBG_MENU = None
 
                                 self.PAINT = False
 
-                self.MANAGER.process_events(event)
+                with self.PROFILER.section('events'):
+                    self.MANAGER.process_events(event)
 
-            self.MANAGER.update(delta)
+            # Mark windows that are covered or off screen, so they can skip rendering.
+            elements = self.MANAGER.get_root_container().elements
+            update_occlusion(elements, self.SCREEN.get_rect())
+            # Suspend and resume apps as they lose and regain focus and visibility.
+            self.LIFECYCLE.refresh(elements, self.focused_window())
 
-            # blit paintbrush/dynbg layer
-            if self.DYNBG is not None:
-                # update dynamic background
-                self.DYNBG.draw(self.BRUSH_SURF)
-                self.SCREEN.blit(self.BG, (0, 0))
-                self.SCREEN.blit(self.BRUSH_SURF, (0, 0))
-            elif self.PAINT:
-                mpos = pygame.mouse.get_pos()
-
-                # default drawing the brush to the temporary brush layer
-                draw_surf = self.BRUSH_SURF
-
-                if pygame.mouse.get_pressed()[0]:
-                    # paint to the actual background
-                    draw_surf = self.BG
-
-                if self.PAINT_SHAPE == 0:
-                    # circle
-                    pygame.draw.circle(
-                        draw_surf,
-                        self.PAINT_COLOR_LIST[self.PAINT_COLOR],
-                        mpos,
-                        self.PAINT_RADIUS,
-                    )
-                elif self.PAINT_SHAPE == 1:
-                    # square
-                    pygame.draw.rect(
-                        draw_surf,
-                        self.PAINT_COLOR_LIST[self.PAINT_COLOR],
-                        pygame.Rect(
-                            (mpos[0] - self.PAINT_RADIUS, mpos[1] - self.PAINT_RADIUS),
-                            (self.PAINT_RADIUS * 2, self.PAINT_RADIUS * 2),
-                        ),
-                    )
-                elif self.PAINT_SHAPE == 2:
-                    # triangle
-                    pygame.draw.polygon(
-                        draw_surf,
-                        self.PAINT_COLOR_LIST[self.PAINT_COLOR],
-                        (
-                            (mpos[0] - self.PAINT_RADIUS, mpos[1] + self.PAINT_RADIUS),
-                            (mpos[0] + self.PAINT_RADIUS, mpos[1] + self.PAINT_RADIUS),
-                            (mpos[0], mpos[1] - self.PAINT_RADIUS),
-                        ),
-                    )
-
-                self.SCREEN.blit(self.BG, (0, 0))
-                self.SCREEN.blit(self.BRUSH_SURF, (0, 0))
-                self.BRUSH_SURF.fill((0, 0, 0, 0))
-            else:
-                # not in paint mode, just blit background
-                self.SCREEN.blit(self.BG, (0, 0))
+            with self.PROFILER.section('update'):
+                self.MANAGER.update(delta)
+
+            # update paintbrush/dynbg layer
+            with self.PROFILER.section('bg'):
+                self.update_brush_layer()
 
-            self.MANAGER.draw_ui(self.SCREEN)
+            # Collect damage from UI elements that changed this frame.
+            self.COMPOSITOR.track_ui()
+            for rect in self.PROFILER.refresh_overlay():
+                self.COMPOSITOR.add_damage(rect)
 
             # Debug / failsafe code for mouse cursor issue
             # --------------------------------------------
@@ -519,8 +729,131 @@ class SnakeWM:
             The pointer coordinates can also run off-screen.
             We deal with that earlier in the script. """
             #print(str(self.new_mouse_pos[0]), str(self.new_mouse_pos[1]))
-            self.SCREEN.blit(self.CURSORIMAGE, (self.new_mouse_pos[0], self.new_mouse_pos[1]))
-            pygame.display.update()
+            self.CURSOR.move(self.new_mouse_pos)
+
+            # Redraw and push only the damaged regions of the screen.
+            self.COMPOSITOR.present(self.draw_region)
+            self.PROFILER.end_frame()
+
+            if first_frame:
+                # Deferred startup work, now that something is on screen.
+                first_frame = False
+                if IMPORT_PROFILER is not None:
+                    IMPORT_PROFILER.mark('first_frame')
+                init_hardware()
+                self.PRELOADER.start()
+                # Build the app menu now, so opening it costs one frame.
+                self.build_appmenu()
+                if IMPORT_PROFILER is not None:
+                    IMPORT_PROFILER.mark('hardware_ready')
+                    IMPORT_PROFILER.report()
+
+    def draw_region(self, surface, rect):
+        """
+        Paint every layer of the desktop into 'rect' of 'surface':
+        wallpaper and paintbrush layer (or the dynamic background), UI and
+        profiler overlay. The
+        mouse cursor is drawn over it by the compositor's cursor plane.
+        The compositor clips 'surface' to 'rect' before calling this.
+        """
+        with self.PROFILER.section('bg'):
+            if self.DYNBG is not None:
+                # dynamic backgrounds cover the wallpaper completely
+                surface.blit(self.DYNBG.surface, rect, rect)
+            else:
+                surface.blit(self.BG, rect, rect)
+                if self.PAINT:
+                    surface.blit(self.BRUSH_SURF, rect, rect)
+        with self.PROFILER.section('draw_ui'):
+            self.MANAGER.draw_ui(surface)
+        self.PROFILER.draw(surface)
+
+    def dump_frame_trace(self):
+        """ Write the frame profiler's recorded frames as JSON and CSV. """
+        if not self.PROFILER.enabled:
+            print('DEBUG: Frame profiler is off. Ctrl+Shift+F turns it on.')
+            return
+        path = os.path.join(CACHE_DIR, time.strftime('frametrace-%Y%m%d-%H%M%S'))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.PROFILER.dump(path + '.json')
+        self.PROFILER.dump(path + '.csv')
+
+    def toggle_frame_recording(self):
+        """
+        Start recording the 1-bit frames pushed to the Sharp display, or
+        save the recording as an .npz for display/bench_rowdiff.py.
+        """
+        if self.FRAMEBUFFER is None:
+            print("DEBUG: Frame recording needs DISPLAY_BACKEND = 'sharp'.")
+            return
+        if self.FRAMEBUFFER.recording is None:
+            print('DEBUG: Recording frames. Ctrl+Shift+R again saves them.')
+            self.FRAMEBUFFER.start_recording()
+            return
+        if not self.FRAMEBUFFER.recording:
+            print('DEBUG: No frames recorded.')
+            self.FRAMEBUFFER.recording = None
+            return
+        path = os.path.join(CACHE_DIR, time.strftime('rowdiff-%Y%m%d-%H%M%S.npz'))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        count = len(self.FRAMEBUFFER.recording)
+        self.FRAMEBUFFER.save_recording(path)
+        print('DEBUG: Saved ' + str(count) + ' frames to ' + path)
+
+    def update_brush_layer(self):
+        """
+        Update the dynamic background, or draw the paintbrush into
+        BRUSH_SURF, and damage what changed.
+        """
+        if self.DYNBG is not None:
+            # update dynamic background; looping ones only change when
+            # their next frame is due, or their sprites move
+            for rect in self.DYNBG.update():
+                self.COMPOSITOR.add_damage(rect)
+        elif self.PAINT:
+            mpos = pygame.mouse.get_pos()
+
+            # erase the brush preview drawn last frame
+            self.BRUSH_SURF.fill((0, 0, 0, 0))
+            self.COMPOSITOR.add_damage(self.brush_rect)
+
+            # default drawing the brush to the temporary brush layer
+            draw_surf = self.BRUSH_SURF
+
+            if pygame.mouse.get_pressed()[0]:
+                # paint to the actual background
+                draw_surf = self.BG
+
+            if self.PAINT_SHAPE == 0:
+                # circle
+                self.brush_rect = pygame.draw.circle(
+                    draw_surf,
+                    self.PAINT_COLOR_LIST[self.PAINT_COLOR],
+                    mpos,
+                    self.PAINT_RADIUS,
+                )
+            elif self.PAINT_SHAPE == 1:
+                # square
+                self.brush_rect = pygame.draw.rect(
+                    draw_surf,
+                    self.PAINT_COLOR_LIST[self.PAINT_COLOR],
+                    pygame.Rect(
+                        (mpos[0] - self.PAINT_RADIUS, mpos[1] - self.PAINT_RADIUS),
+                        (self.PAINT_RADIUS * 2, self.PAINT_RADIUS * 2),
+                    ),
+                )
+            elif self.PAINT_SHAPE == 2:
+                # triangle
+                self.brush_rect = pygame.draw.polygon(
+                    draw_surf,
+                    self.PAINT_COLOR_LIST[self.PAINT_COLOR],
+                    (
+                        (mpos[0] - self.PAINT_RADIUS, mpos[1] + self.PAINT_RADIUS),
+                        (mpos[0] + self.PAINT_RADIUS, mpos[1] + self.PAINT_RADIUS),
+                        (mpos[0], mpos[1] - self.PAINT_RADIUS),
+                    ),
+                )
+            self.COMPOSITOR.add_damage(self.brush_rect)
 
 
 if TESTMODE: